@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+============================================================================
+FANDREAMS PLATFORM — BENCHMARK DO SCANNER EXTERNO
+============================================================================
+
+Sobe o stub local da API (fandreams_api_stub.py) e roda SecurityScanner.run_all
+em cada combinação de engine, --jobs e concorrência por host. Cada execução
+roda num processo novo, para que o pico de RSS seja só daquele scan, e o
+estado do stub é zerado entre execuções. Grava benchmark.json e benchmark.md
+com tempo de parede, requisições/s, pico de RSS e tempo por suite.
+
+Também confere que os findings e o resultado de cada teste são idênticos em
+todas as combinações: qualquer divergência aparece no relatório e o exit code
+é 1, então o benchmark serve de teste de regressão offline.
+
+Uso:
+    python fandreams_scanner_benchmark.py
+    python fandreams_scanner_benchmark.py --engines sync,async --jobs 1,4 --latency-ms 20 --repeat 3
+    python fandreams_scanner_benchmark.py --vulns xss-reflected,sqli --concurrency 4,16 --output ./bench
+
+============================================================================
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, asdict
+from datetime import datetime, timezone
+from typing import Optional
+
+try:
+    import resource
+except ImportError:     # Windows: sem getrusage, o pico de RSS fica de fora
+    resource = None
+
+import fandreams_security_scanner as scanner
+from fandreams_api_stub import VULNERABILITIES, StubConfig, StubServer, parse_vulns
+
+
+# ============================================================================
+# CONFIGURAÇÃO
+# ============================================================================
+
+DEFAULT_ENGINES = 'sync,async'
+DEFAULT_JOBS = '1,4'
+DEFAULT_LATENCY_MS = 5.0      # Latência do stub: deixa o ganho de concorrência visível
+# Todas as vulnerabilidades menos a que desliga o limite de /auth: os 429 são
+# justamente o que --jobs e os engines não podem mudar de lugar
+DEFAULT_VULNS = ','.join(v for v in VULNERABILITIES if v != 'no-auth-rate-limit')
+
+
+@dataclass(frozen=True)
+class BenchCombo:
+    """Uma combinação de parâmetros do scanner a medir."""
+    engine: str
+    jobs: int
+    concurrency: int
+    cache: bool
+
+    @property
+    def label(self) -> str:
+        return f"{self.engine}/jobs={self.jobs}/conc={self.concurrency}{'' if self.cache else '/no-cache'}"
+
+
+# ============================================================================
+# EXECUÇÃO ISOLADA (PROCESSO FILHO)
+# ============================================================================
+
+def _peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta em KB, macOS em bytes
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def _run_scan(target: str, combo: BenchCombo) -> dict:
+    """Roda um scan completo num processo novo e devolve as métricas e a identidade dos resultados."""
+    sys.stdout = open(os.devnull, 'w', encoding='utf-8')    # A saída das suites não interessa aqui
+    cache = scanner.ResponseCache() if combo.cache else None
+    s = scanner.SecurityScanner(target, engine=combo.engine, concurrency=combo.concurrency, cache=cache)
+    start = time.perf_counter()
+    try:
+        report = s.run_all(jobs=combo.jobs)
+    except SystemExit:
+        raise RuntimeError(f"{target} não respondeu ao /health")
+    finally:
+        s.close()
+    wall = time.perf_counter() - start
+    requests_sent = report.transport['totals']['requests']
+    return {
+        'wall_s': round(wall, 3),
+        'requests': requests_sent,
+        'requests_per_s': round(requests_sent / wall, 1) if wall else 0.0,
+        'peak_rss_mb': _peak_rss_mb(),
+        'suite_ms': {t['suite']: t['duration_ms'] for t in report.suite_timings},
+        'score': report.confidence_score,
+        # Na ordem do relatório: engines e --jobs precisam produzir Finding/TestResult na mesma ordem
+        'findings': [f"{f['severity']} {f['fingerprint']} {f['title']}" for f in report.findings],
+        'results': [f"{'PASS' if t['passed'] else 'FAIL'} {t['category']} {t['test_name']}"
+                    for t in report.test_results],
+    }
+
+
+# ============================================================================
+# MATRIZ, RESUMO E IDENTIDADE
+# ============================================================================
+
+def run_matrix(stub: StubServer, combos: list, repeat: int) -> list:
+    """Executa cada combinação `repeat` vezes contra o stub, sempre com o estado zerado."""
+    ctx = multiprocessing.get_context('spawn')
+    runs = []
+    for combo in combos:
+        for i in range(1, repeat + 1):
+            stub.reset()
+            with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+                data = pool.submit(_run_scan, stub.url, combo).result()
+            data.update(combo=combo.label, repeat=i, stub_requests=stub.state.snapshot()['requests'])
+            runs.append(data)
+            rss = f"{data['peak_rss_mb']} MB" if data['peak_rss_mb'] is not None else 'n/d'
+            print(f"  [{combo.label} #{i}] {data['wall_s']:.2f}s, {data['requests']} req "
+                  f"({data['requests_per_s']} req/s), RSS {rss}, {len(data['findings'])} findings")
+    return runs
+
+
+def summarize(combos: list, runs: list) -> list:
+    """Mediana das repetições de cada combinação, com speedup relativo à primeira."""
+    summary = []
+    for combo in combos:
+        mine = [r for r in runs if r['combo'] == combo.label]
+        suites = sorted({name for r in mine for name in r['suite_ms']})
+        rss = [r['peak_rss_mb'] for r in mine if r['peak_rss_mb'] is not None]
+        summary.append({
+            **asdict(combo),
+            'label': combo.label,
+            'runs': len(mine),
+            'wall_s': round(statistics.median(r['wall_s'] for r in mine), 3),
+            'requests': round(statistics.median(r['requests'] for r in mine)),
+            'requests_per_s': round(statistics.median(r['requests_per_s'] for r in mine), 1),
+            'peak_rss_mb': max(rss) if rss else None,
+            'suite_ms': {name: round(statistics.median(r['suite_ms'].get(name, 0.0) for r in mine), 1)
+                         for name in suites},
+        })
+    base = summary[0]['wall_s'] if summary else 0.0
+    for entry in summary:
+        entry['speedup'] = round(base / entry['wall_s'], 2) if entry['wall_s'] else 0.0
+    return summary
+
+
+def divergences(runs: list) -> list:
+    """Execuções cujos findings ou resultados diferem da primeira (a referência), inclusive só na ordem.
+
+    A comparação é das listas na ordem do relatório; a diferença como multiconjunto
+    (faltando/a mais) serve só para o relatório, e quando ela é vazia a
+    divergência é de ordem, apontada pela primeira posição diferente.
+    """
+    if not runs:
+        return []
+    ref = runs[0]
+    diffs = []
+    for run in runs[1:]:
+        entry = {'combo': run['combo'], 'repeat': run['repeat']}
+        for key in ('findings', 'results'):
+            if run[key] == ref[key]:
+                continue
+            expected, got = Counter(ref[key]), Counter(run[key])
+            entry[key] = {'missing': sorted((expected - got).elements()),
+                          'extra': sorted((got - expected).elements())}
+            if expected == got:
+                index = next(i for i, (a, b) in enumerate(zip(ref[key], run[key])) if a != b)
+                entry[key]['order'] = {'index': index, 'expected': ref[key][index], 'got': run[key][index]}
+        if len(entry) > 2:
+            diffs.append(entry)
+    return diffs
+
+
+def benchmark_markdown(data: dict) -> str:
+    md = ["# FanDreams External Scanner — Benchmark"]
+    md.append(f"\n**Data:** {data['date']}")
+    stub = data['stub']
+    md.append(f"**Stub:** latência {stub['latency_ms']} ms (±{stub['jitter_ms']}), "
+              f"limite global {stub['api_limit'] or 'desligado'}, limite de auth {stub['auth_limit'] or 'desligado'}, "
+              f"vulnerabilidades: {', '.join(stub['vulns']) or 'nenhuma'}")
+
+    md.append("\n## Resultado por Combinação")
+    md.append("\n| Combinação | Execuções | Tempo (s) | Speedup | Requisições | Req/s | Pico RSS (MB) |")
+    md.append("|---|---|---|---|---|---|---|")
+    for c in data['combos']:
+        rss = c['peak_rss_mb'] if c['peak_rss_mb'] is not None else 'n/d'
+        md.append(f"| {c['label']} | {c['runs']} | {c['wall_s']} | {c['speedup']}x | {c['requests']} | "
+                  f"{c['requests_per_s']} | {rss} |")
+
+    suites = [name for name, _, _ in scanner.SUITES if any(name in c['suite_ms'] for c in data['combos'])]
+    md.append("\n## Tempo por Suite (ms, mediana)")
+    md.append("\n| Suite | " + " | ".join(c['label'] for c in data['combos']) + " |")
+    md.append("|---|" + "---|" * len(data['combos']))
+    for name in suites:
+        md.append(f"| {name} | " + " | ".join(str(c['suite_ms'].get(name, '-')) for c in data['combos']) + " |")
+
+    md.append("\n## Identidade dos Resultados")
+    if not data['divergences']:
+        md.append(f"\nFindings e resultados idênticos em todas as {len(data['runs'])} execuções "
+                  f"({len(data['runs'][0]['findings']) if data['runs'] else 0} findings).")
+    else:
+        md.append(f"\n**{len(data['divergences'])} execução(ões) divergem de {data['runs'][0]['combo']} #1:**")
+        for d in data['divergences']:
+            md.append(f"\n### {d['combo']} #{d['repeat']}")
+            for key in ('findings', 'results'):
+                for item in d.get(key, {}).get('missing', []):
+                    md.append(f"- falta: `{item}`")
+                for item in d.get(key, {}).get('extra', []):
+                    md.append(f"- a mais: `{item}`")
+                order = d.get(key, {}).get('order')
+                if order:
+                    md.append(f"- {key} em outra ordem a partir da posição {order['index']}: "
+                              f"esperado `{order['expected']}`, veio `{order['got']}`")
+
+    md.append(f"\n---\n*Gerado por FanDreams Scanner Benchmark v{scanner.VERSION}*")
+    return '\n'.join(md)
+
+
+def _csv(value: str, cast=str) -> list:
+    return [cast(v.strip()) for v in value.split(',') if v.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark e teste de regressão do scanner externo contra o stub local da API',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Exemplos:
+  python fandreams_scanner_benchmark.py
+  python fandreams_scanner_benchmark.py --engines sync,async --jobs 1,4 --latency-ms 20 --repeat 3
+  python fandreams_scanner_benchmark.py --vulns xss-reflected,sqli --concurrency 4,16 --output ./bench
+        """
+    )
+    parser.add_argument('--engines', default=DEFAULT_ENGINES, help='Engines a comparar (sync,async)')
+    parser.add_argument('--jobs', default=DEFAULT_JOBS, help='Valores de --jobs a comparar')
+    parser.add_argument('--concurrency', default=str(scanner.HOST_CONCURRENCY),
+                        help='Valores de concorrência por host a comparar')
+    parser.add_argument('--no-cache', action='store_true', help='Roda os scans sem o cache de respostas')
+    parser.add_argument('--repeat', type=int, default=1, help='Execuções por combinação (vale a mediana)')
+    parser.add_argument('--latency-ms', type=float, default=DEFAULT_LATENCY_MS, help='Latência do stub')
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help='Variação (±) da latência do stub')
+    parser.add_argument('--api-limit', type=int, default=StubConfig.api_limit,
+                        help=f'Limite global do stub por janela (padrão {StubConfig.api_limit}, 0 desliga). '
+                             'A identidade só vale enquanto as suites independentes, que rodam em paralelo, '
+                             'ficam abaixo dele; um limite menor gera 429s que dependem da intercalação')
+    parser.add_argument('--auth-limit', type=int, default=StubConfig.auth_limit,
+                        help=f'Limite de /auth no stub (padrão {StubConfig.auth_limit}, 0 desliga)')
+    parser.add_argument('--vulns', type=parse_vulns, default=parse_vulns(DEFAULT_VULNS),
+                        help="Vulnerabilidades injetadas no stub (padrão: todas menos no-auth-rate-limit)")
+    parser.add_argument('--seed', type=int, default=0, help='Semente do jitter do stub')
+    parser.add_argument('--output', '-o', default='./benchmark', help='Diretório dos relatórios')
+    args = parser.parse_args()
+
+    try:
+        combos = [BenchCombo(engine, jobs, concurrency, not args.no_cache)
+                  for engine in _csv(args.engines)
+                  for jobs in _csv(args.jobs, int)
+                  for concurrency in _csv(args.concurrency, int)]
+    except ValueError as e:
+        parser.error(str(e))
+    unknown = sorted({c.engine for c in combos} - {'sync', 'async'})
+    if unknown:
+        parser.error(f"engine desconhecido: {', '.join(unknown)}")
+    if not combos or args.repeat < 1:
+        parser.error('nada a executar: informe ao menos um engine, um --jobs e --repeat >= 1')
+
+    config = StubConfig(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, api_limit=args.api_limit,
+                        auth_limit=args.auth_limit, vulns=args.vulns, seed=args.seed)
+    print("=" * 70)
+    print("  FANDREAMS EXTERNAL SCANNER — BENCHMARK v" + scanner.VERSION)
+    print(f"  {len(combos)} combinações x {args.repeat} execução(ões), stub com {config.latency_ms} ms de latência")
+    print("=" * 70)
+
+    stub = StubServer(config).start()
+    try:
+        runs = run_matrix(stub, combos, args.repeat)
+    finally:
+        stub.stop()
+
+    data = {
+        'date': datetime.now(timezone.utc).isoformat(),
+        'scanner_version': scanner.VERSION,
+        'stub': {**asdict(config), 'vulns': sorted(config.vulns)},
+        'combos': summarize(combos, runs),
+        'divergences': divergences(runs),
+        'runs': runs,
+    }
+
+    os.makedirs(args.output, exist_ok=True)
+    json_path = os.path.join(args.output, 'benchmark.json')
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    md_path = os.path.join(args.output, 'benchmark.md')
+    with open(md_path, 'w', encoding='utf-8') as f:
+        f.write(benchmark_markdown(data))
+
+    print(f"\n  {'Combinação':<32} {'Tempo':>8} {'Speedup':>8} {'Req/s':>8} {'RSS MB':>8}")
+    for c in data['combos']:
+        rss = c['peak_rss_mb'] if c['peak_rss_mb'] is not None else 'n/d'
+        print(f"  {c['label']:<32} {c['wall_s']:>7.2f}s {c['speedup']:>7.2f}x {c['requests_per_s']:>8} {rss:>8}")
+    if data['divergences']:
+        print(f"\n  [✗] {len(data['divergences'])} execução(ões) com findings/resultados diferentes — veja {md_path}")
+    else:
+        print(f"\n  [✓] Findings e resultados idênticos em todas as execuções")
+    print(f"\n  📄 JSON: {json_path}")
+    print(f"  📄 Markdown: {md_path}")
+    sys.exit(1 if data['divergences'] else 0)
+
+
+if __name__ == "__main__":
+    main()
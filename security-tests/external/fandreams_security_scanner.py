@@ -14,6 +14,7 @@ Dependências (pip install):
 Uso:
     python fandreams_security_scanner.py --target https://api.fandreams.app
     python fandreams_security_scanner.py --target http://localhost:3001
+    python fandreams_security_scanner.py --target http://localhost:3001 --engine async
 
 O script gera um relatório JSON + Markdown que deve ser trazido de volta
 ao prompt do Claude para consolidação com o teste interno.
@@ -26,21 +27,37 @@ da plataforma FanDreams. Uso não autorizado é ilegal.
 
 import argparse
 import asyncio
+import codecs
+import contextlib
 import json
 import os
 import sys
 import time
+import gzip
 import hashlib
+import inspect
+import io
+import itertools
+import math
 import random
+import re
+import sqlite3
 import string
+import threading
+import uuid
+from collections import Counter, OrderedDict
 from datetime import datetime, timezone
 from dataclasses import dataclass, field, asdict
 from typing import Optional
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from urllib.parse import urlsplit
 
 try:
     import requests
     from requests.adapters import HTTPAdapter
+    from requests.structures import CaseInsensitiveDict
+    from requests.utils import get_encoding_from_headers
+    import urllib3
     from urllib3.util.retry import Retry
 except ImportError:
     print("[!] Instale: pip install requests")
@@ -50,7 +67,7 @@ try:
     import aiohttp
 except ImportError:
     aiohttp = None
-    print("[!] aiohttp não instalado. Testes async serão executados com threads.")
+    print("[!] aiohttp não instalado. --engine async usará o engine síncrono.")
 
 
 # ============================================================================
@@ -61,9 +78,24 @@ VERSION = "1.0.0"
 USER_AGENT = "FanDreams-SecurityScanner/1.0"
 MAX_WORKERS = 20
 REQUEST_TIMEOUT = 15
-
-
-@dataclass
+HOST_CONCURRENCY = 8          # Limite de requisições simultâneas por host (engine async)
+CONCURRENT_PROBE_CONNECTIONS = 50
+RETRY_TOTAL = 2
+RETRY_BACKOFF = 0.5
+RETRY_STATUSES = (502, 503, 504)
+RETRY_METHODS = frozenset({'DELETE', 'GET', 'HEAD', 'OPTIONS', 'PUT', 'TRACE'})
+CACHE_TTL = 60.0              # Segundos que uma resposta idempotente fica em cache
+CACHE_MAX_ENTRIES = 256
+CACHEABLE_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS'})
+BASELINE_DB = 'scan_baseline.sqlite3'
+FLEET_BUDGET = 32             # Requisições simultâneas somando todos os targets (--targets-file)
+CORPUS_BATCH = 64             # Payloads de um corpus enviados por lote ao engine
+CORPUS_DEDUP_CAPACITY = 1_000_000   # Payloads distintos que o filtro de Bloom comporta por corpus
+CORPUS_DEDUP_ERROR = 0.001    # Taxa de falso positivo do filtro (payload inédito pulado)
+SIGNATURE_CHUNK = 64 * 1024   # Bytes por fatia na varredura de assinaturas do corpo
+
+
+@dataclass(slots=True)
 class Finding:
     """Representa uma vulnerabilidade encontrada."""
     category: str           # OWASP category
@@ -76,9 +108,21 @@ class Finding:
     owasp_id: str = ""      # OWASP ID
     remediation: str = ""
     cvss_estimate: float = 0.0
+    corpus: str = ""        # Versão do corpus de payloads que gerou o finding
+    signature: str = ""     # Assinatura de resposta que disparou o finding
+    signature_offset: int = -1  # Byte do corpo onde a assinatura casou
 
+    @property
+    def fingerprint(self) -> str:
+        return finding_fingerprint(self.category, self.endpoint, self.title)
 
-@dataclass
+
+def finding_fingerprint(category: str, endpoint: str, title: str) -> str:
+    """Identidade estável de um finding entre scans (não depende de evidência nem de datas)."""
+    return hashlib.sha256(f"{category}|{endpoint}|{title}".encode('utf-8')).hexdigest()[:16]
+
+
+@dataclass(slots=True)
 class TestResult:
     """Resultado individual de um teste."""
     test_name: str
@@ -87,7 +131,14 @@ class TestResult:
     details: str
     duration_ms: float = 0.0
     requests_sent: int = 0
-    status_codes: list = field(default_factory=list)
+    status_codes: dict = field(default_factory=dict)   # status HTTP -> quantidade
+
+    def __post_init__(self):
+        # Aceita a lista crua de status e guarda só a contagem
+        if isinstance(self.status_codes, dict):
+            self.status_codes = {int(code): n for code, n in self.status_codes.items()}
+        else:
+            self.status_codes = dict(Counter(self.status_codes))
 
 
 @dataclass
@@ -107,50 +158,1160 @@ class ScanReport:
     grade: str = ""
     category_scores: dict = field(default_factory=dict)
     summary: str = ""
+    transport: dict = field(default_factory=dict)
+    baseline: dict = field(default_factory=dict)
+    cache: dict = field(default_factory=dict)
+    suite_timings: list = field(default_factory=list)
+    critical_path: list = field(default_factory=list)
+    corpora: dict = field(default_factory=dict)
+
+
+# Suites na ordem canônica do relatório: (nome, método, grupo de isolamento).
+# Suites sem grupo são independentes e rodam em paralelo com --jobs > 1. As que
+# consomem um rate limit ficam em grupos serializados, executados sozinhos depois
+# das independentes, para que os 429 não vazem para o resultado das outras suites.
+# Toda suite que chama /auth/* divide o authRateLimit do apps/api e entra no
+# grupo 'auth-rate-limit'.
+SUITES = [
+    ('recon', 'test_reconnaissance', None),
+    ('auth', 'test_auth_bruteforce', 'auth-rate-limit'),
+    ('jwt', 'test_jwt_attacks', None),
+    ('injection', 'test_injection_attacks', 'auth-rate-limit'),  # payloads em /auth/login e /auth/register
+    ('xss', 'test_xss_attacks', 'auth-rate-limit'),             # stored XSS via /auth/register
+    ('authz', 'test_authorization_attacks', None),
+    ('rate', 'test_rate_limiting', 'global-rate-limit'),
+    ('cors', 'test_cors', None),
+    ('headers', 'test_security_headers', None),
+    ('webhook', 'test_webhook_security', None),
+    ('mass', 'test_mass_assignment', 'auth-rate-limit'),        # /auth/register com campos extras
+    ('data', 'test_data_exposure', 'auth-rate-limit'),          # mensagem de erro do /auth/login
+]
 
 
-class SecurityScanner:
-    """Scanner de segurança externo para a API FanDreams."""
+@dataclass
+class SuiteRun:
+    """Execução de uma suite: janela de tempo e o que ela produziu."""
+    name: str
+    method: str
+    group: str = ""
+    start: str = ""
+    end: str = ""
+    start_ms: float = 0.0   # Offset relativo ao início das suites
+    end_ms: float = 0.0
+    error: str = ""
+    reused: bool = False    # Resultado restaurado (baseline ou stream), suite não executada
+    run_id: str = ""
+    findings: list = field(default_factory=list)
+    results: list = field(default_factory=list)
+    output: str = ""
+
+    @property
+    def failed(self) -> bool:
+        return bool(self.error) or any(not r.passed for r in self.results)
+
+    def timing(self) -> dict:
+        return {
+            'suite': self.name, 'group': self.group or 'parallel',
+            'start': self.start, 'end': self.end,
+            'start_ms': round(self.start_ms, 1), 'end_ms': round(self.end_ms, 1),
+            'duration_ms': round(self.end_ms - self.start_ms, 1),
+            'error': self.error,
+            'reused': self.reused,
+        }
 
-    def __init__(self, target: str, verbose: bool = False):
-        self.target = target.rstrip('/')
-        self.base_url = f"{self.target}/api/v1"
-        self.verbose = verbose
-        self.findings: list[Finding] = []
-        self.results: list[TestResult] = []
+
+def critical_path(runs: list) -> list:
+    """Cadeia de suites que determina o tempo total: parte da que terminou por último
+    e volta sempre para a suite que terminou mais tarde antes do início da atual."""
+    path = []
+    runs = [r for r in runs if not r.reused]
+    current = max(runs, key=lambda r: r.end_ms, default=None)
+    while current is not None:
+        path.append(current.name)
+        prior = [r for r in runs if r.end_ms <= current.start_ms]
+        current = max(prior, key=lambda r: r.end_ms, default=None)
+    return path[::-1]
+
+
+def select_suites(only: Optional[list] = None, skip: Optional[list] = None) -> list:
+    """Filtra SUITES por nome curto ou nome do método, preservando a ordem canônica."""
+    known = {name for name, _, _ in SUITES} | {method for _, method, _ in SUITES}
+    unknown = [s for s in (only or []) + (skip or []) if s not in known]
+    if unknown:
+        raise ValueError(f"Suites desconhecidas: {unknown}. Disponíveis: {[n for n, _, _ in SUITES]}")
+    selected = []
+    for name, method, group in SUITES:
+        if only and name not in only and method not in only:
+            continue
+        if skip and (name in skip or method in skip):
+            continue
+        selected.append((name, method, group))
+    return selected
+
+
+class _SuiteOutput:
+    """Proxy de sys.stdout que separa a saída de cada suite rodando em thread própria."""
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._local = threading.local()
+
+    def capture(self):
+        self._local.buffer = io.StringIO()
+
+    def release(self) -> str:
+        buffer, self._local.buffer = self._local.buffer, None
+        return buffer.getvalue()
+
+    def write(self, text: str):
+        buffer = getattr(self._local, 'buffer', None)
+        return (buffer or self._stream).write(text)
+
+    def flush(self):
+        self._stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+# ============================================================================
+# STREAM DE EVENTOS (NDJSON)
+# ============================================================================
+
+class EventStream:
+    """Log NDJSON append-only do scan: uma linha por evento, gravada e descarregada na hora.
+
+    Eventos: scan_start, suite_start, finding, result, suite_end e scan_end. O
+    arquivo pode ser acompanhado com `tail -f` e sobrevive a um crash no meio do
+    scan; `load_stream` o relê para retomar o scan ou reconstruir o relatório.
+    """
+
+    def __init__(self, path: str, append: bool = False):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, 'a' if append else 'w', encoding='utf-8')
+        self._lock = threading.Lock()
+
+    def emit(self, event: str, **data):
+        line = json.dumps({'event': event, 'ts': datetime.now(timezone.utc).isoformat(), **data},
+                          ensure_ascii=False, default=str)
+        with self._lock:
+            self._file.write(line + '\n')
+            self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+def read_events(path: str):
+    """Gera os eventos do stream, ignorando a última linha se ela foi truncada por um crash."""
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+def load_stream(path: str) -> tuple:
+    """Relê um stream e retorna `(scan_start, {suite: SuiteRun concluída}, scan_end ou None)`.
+
+    Para cada suite vale a última execução que chegou ao suite_end; execuções
+    interrompidas (sem suite_end) são descartadas.
+    """
+    start, end = None, None
+    open_runs: dict[str, SuiteRun] = {}
+    finished: dict[str, SuiteRun] = {}
+    for ev in read_events(path):
+        kind = ev.get('event')
+        if kind == 'scan_start':
+            start = start or ev
+        elif kind == 'scan_end':
+            end = ev
+        elif kind == 'suite_start':
+            open_runs[ev['run_id']] = SuiteRun(name=ev['suite'], method=ev['method'], group=ev.get('group') or "",
+                                               run_id=ev['run_id'], reused=True)
+        elif kind in ('finding', 'result') and ev.get('run_id') in open_runs:
+            run = open_runs[ev['run_id']]
+            if kind == 'finding':
+                run.findings.append(Finding(**ev['data']))
+            else:
+                run.results.append(TestResult(**ev['data']))
+        elif kind == 'suite_end' and ev.get('run_id') in open_runs:
+            run = open_runs.pop(ev['run_id'])
+            run.start, run.end = ev.get('start', ''), ev.get('end', '')
+            run.start_ms, run.end_ms = ev.get('start_ms', 0.0), ev.get('end_ms', 0.0)
+            run.error = ev.get('error', '')
+            finished[run.name] = run
+    if start is None:
+        raise ValueError(f"{path}: stream sem evento scan_start")
+    return start, finished, end
+
+
+# ============================================================================
+# CORPORA DE PAYLOADS
+# ============================================================================
+
+# Corpora embutidos; --corpus NOME=ARQUIVO troca qualquer um deles por um arquivo
+SQL_PAYLOADS = (
+    "' OR '1'='1",
+    "'; DROP TABLE users;--",
+    "1' UNION SELECT * FROM users--",
+    "admin'--",
+    "1; DELETE FROM users WHERE 1=1",
+    "' AND (SELECT COUNT(*) FROM information_schema.tables) > 0--",
+    "') OR ('1'='1",
+    "' OR SLEEP(5)--",
+    "1' AND 1=CONVERT(int, (SELECT TOP 1 table_name FROM information_schema.tables))--",
+    "' UNION ALL SELECT NULL,password_hash,NULL FROM users--",
+)
+
+NOSQL_PAYLOADS = (
+    {"$gt": ""},
+    {"$ne": None},
+    {"$regex": ".*"},
+    {"$where": "1==1"},
+)
+
+XSS_PAYLOADS = (
+    '<script>alert("XSS")</script>',
+    '<img src=x onerror=alert(1)>',
+    '<svg/onload=alert(1)>',
+    'javascript:alert(1)',
+    '"><img src=x onerror=alert(1)>',
+    "'><script>alert(document.cookie)</script>",
+    '<body onload=alert(1)>',
+    '<details open ontoggle=alert(1)>',
+    '<math><mtext><table><mglyph><style><!--</style><img src=x onerror=alert(1)>',
+    '<a href="data:text/html,<script>alert(1)</script>">click</a>',
+)
+
+COMMON_PASSWORDS = (
+    'password', '123456', '12345678', 'admin', 'letmein',
+    'welcome', 'monkey', '1234567', 'dragon', '111111',
+    'baseball', 'master', 'qwerty', 'abc123', 'login',
+    'admin123', 'Password1', 'p@ssw0rd', '1q2w3e4r',
+    'passw0rd',
+)
+
+BUILTIN_CORPORA = {
+    'sql': SQL_PAYLOADS,
+    'nosql': NOSQL_PAYLOADS,
+    'xss': XSS_PAYLOADS,
+    'passwords': COMMON_PASSWORDS,
+}
+
+# Corpora cujos payloads podem ser qualquer valor JSON (ex.: {"$gt": ""}); os demais só aceitam strings
+STRUCTURED_CORPORA = frozenset({'nosql'})
+
+# Corpora consumidos por cada suite (entram na assinatura usada por --since-baseline)
+SUITE_CORPORA = {
+    'test_auth_bruteforce': ('passwords',),
+    'test_injection_attacks': ('sql', 'nosql'),
+    'test_xss_attacks': ('xss',),
+}
+
+
+def _payload_digest(payload) -> int:
+    """Hash de 128 bits do payload: base da deduplicação, da amostragem e do shard."""
+    key = payload if isinstance(payload, str) else json.dumps(payload, sort_keys=True, ensure_ascii=False)
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest(), 'big')
+
+
+class BloomFilter:
+    """Conjunto aproximado de tamanho fixo para deduplicar corpora grandes.
+
+    Ocupa ~1.8 MB para 1 milhão de payloads a 0.1% de falso positivo. Um falso
+    positivo faz um payload inédito ser pulado; um payload nunca é enviado duas vezes.
+    """
+
+    def __init__(self, capacity: int = CORPUS_DEDUP_CAPACITY, error_rate: float = CORPUS_DEDUP_ERROR):
+        capacity = max(capacity, 1)
+        self.size = max(64, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def add(self, digest: int) -> bool:
+        """Marca o item pelo seu hash de 128 bits; retorna False se ele (provavelmente) já estava lá."""
+        h1, h2 = digest >> 64, (digest & 0xFFFFFFFFFFFFFFFF) | 1
+        new = False
+        for i in range(self.hashes):
+            bit = (h1 + i * h2) % self.size
+            byte, mask = bit >> 3, 1 << (bit & 7)
+            if not self._bits[byte] & mask:
+                self._bits[byte] |= mask
+                new = True
+        return new
+
+
+@dataclass
+class PayloadCorpus:
+    """Fonte de payloads de um tipo de ataque, lida sob demanda.
+
+    `path` aponta para um .txt (um payload por linha, `#` comenta) ou um .jsonl
+    (um valor JSON por linha, ou {"payload": ...}), opcionalmente .gz; sem `path`
+    vale a lista embutida `items`. Valores que não são string só valem em corpora
+    `structured`; nos demais contam como inválidos. Iterar nunca carrega o arquivo inteiro. A
+    amostragem e o shard são decididos pelo hash de cada payload, então são
+    estáveis entre execuções e os workers de CI com `shard=(i, n)` dividem o
+    corpus sem sobreposição.
+    """
+    name: str
+    path: str = ""
+    items: tuple = ()
+    sample: float = 1.0
+    shard: tuple = (1, 1)       # (i, n): este worker fica com a fatia i de n
+    structured: bool = False    # Aceita payloads JSON que não são string (ver STRUCTURED_CORPORA)
+    version: str = ""
+    stats: dict = field(default_factory=dict)
+
+    def __post_init__(self):
+        if not self.version:
+            source = os.path.basename(self.path) if self.path else 'builtin'
+            self.version = f"{self.name}:{source}@{self._digest()}"
+
+    def _digest(self) -> str:
+        h = hashlib.sha256()
+        if not self.path:
+            h.update(json.dumps(list(self.items), sort_keys=True).encode('utf-8'))
+        else:
+            with open(self.path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    h.update(chunk)
+        return h.hexdigest()[:12]
+
+    @property
+    def signature(self) -> str:
+        """Versão + recorte (amostra/shard): muda sempre que os payloads enviados mudam."""
+        return f"{self.version}|sample={self.sample}|shard={self.shard[0]}/{self.shard[1]}"
+
+    def describe(self) -> dict:
+        return {'version': self.version, 'path': self.path, 'sample': self.sample,
+                'shard': f"{self.shard[0]}/{self.shard[1]}", 'stats': dict(self.stats)}
+
+    def _read(self):
+        if not self.path:
+            yield from self.items
+            return
+        jsonl = self.path.removesuffix('.gz').endswith('.jsonl')
+        opener = gzip.open if self.path.endswith('.gz') else open
+        with opener(self.path, 'rt', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                line = line.rstrip('\r\n')
+                if not jsonl or not line.strip():
+                    # Linhas em branco seguem adiante para __iter__ descartá-las (e contá-las)
+                    if not line.startswith('#'):
+                        yield line
+                    continue
+                try:
+                    value = json.loads(line)
+                except json.JSONDecodeError:
+                    self.stats['invalid'] = self.stats.get('invalid', 0) + 1
+                    continue
+                payload = value['payload'] if isinstance(value, dict) and 'payload' in value else value
+                if not (self.structured or isinstance(payload, str)):
+                    # Vai para URL, assinatura e evidência como texto: número/objeto aqui é erro do corpus
+                    self.stats['invalid'] = self.stats.get('invalid', 0) + 1
+                    continue
+                yield payload
+
+    def __iter__(self):
+        index, count = self.shard
+        seen = BloomFilter(len(self.items) if not self.path else CORPUS_DEDUP_CAPACITY)
+        stats = self.stats      # Acumula entre passadas (ex.: lote completo + take(5))
+        for key in ('read', 'skipped', 'duplicates', 'sent'):
+            stats.setdefault(key, 0)
+        for payload in self._read():
+            stats['read'] += 1
+            if isinstance(payload, str) and not payload.strip():
+                stats['skipped'] += 1       # Payload vazio "reflete" em qualquer resposta
+                continue
+            digest = _payload_digest(payload)
+            if digest % count != index - 1 or (digest >> 96) / 2 ** 32 >= self.sample:
+                stats['skipped'] += 1
+            elif not seen.add(digest):
+                stats['duplicates'] += 1
+            else:
+                stats['sent'] += 1
+                yield payload
+
+    def batches(self, size: int = CORPUS_BATCH):
+        """Gera listas de até `size` payloads para `_req_many`."""
+        payloads = iter(self)
+        while batch := list(itertools.islice(payloads, size)):
+            yield batch
+
+    def take(self, n: int) -> list:
+        return list(itertools.islice(self, n))
+
+
+def parse_shard(value: str) -> tuple:
+    """Tipo do argparse para --shard: '2/4' -> (2, 4)."""
+    try:
+        index, count = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"shard inválido: {value!r} (use i/n, ex.: 2/4)")
+    if not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(f"shard inválido: {value!r} (precisa de 1 <= i <= n)")
+    return index, count
+
+
+def load_corpora(specs: Optional[list] = None, sample: float = 1.0, shard: tuple = (1, 1)) -> dict:
+    """Monta os corpora do scan: embutidos, trocados pelos arquivos de `--corpus NOME=ARQUIVO`."""
+    paths = {}
+    for spec in specs or ():
+        name, sep, path = spec.partition('=')
+        if not sep or name not in BUILTIN_CORPORA:
+            raise ValueError(f"--corpus {spec!r}: use NOME=ARQUIVO, com NOME em {', '.join(BUILTIN_CORPORA)}")
+        if not os.path.isfile(path):
+            raise ValueError(f"--corpus {spec!r}: arquivo não encontrado")
+        paths[name] = path
+    return {name: PayloadCorpus(name, path=paths.get(name, ''), items=items, sample=sample, shard=shard,
+                                structured=name in STRUCTURED_CORPORA)
+            for name, items in BUILTIN_CORPORA.items()}
+
+
+# ============================================================================
+# ASSINATURAS DE RESPOSTA
+# ============================================================================
+
+@dataclass(frozen=True, slots=True)
+class Signature:
+    """Padrão literal procurado no corpo das respostas."""
+    name: str               # ex.: leak.secret, error.stack
+    pattern: str
+    kind: str               # leak, error, reflection
+    label: str = ""         # Texto usado nos detalhes dos testes (padrão: o próprio pattern)
+    ignore_case: bool = False
+
+    def __post_init__(self):
+        if not self.label:
+            object.__setattr__(self, 'label', self.pattern)
+
+
+@dataclass(slots=True)
+class SignatureMatch:
+    signature: Signature
+    offset: int             # Byte da primeira ocorrência no corpo (em UTF-8)
+
+    def __str__(self) -> str:
+        return f"{self.signature.name}@{self.offset}"
+
+
+class SignatureEngine:
+    """Procura várias assinaturas numa única passada pelo corpo.
+
+    Todas as assinaturas viram uma só alternação compilada de literais em
+    minúsculas, aplicada a cada fatia do corpo em minúsculas (cópia limitada a
+    uma fatia, nunca ao corpo inteiro); as que diferenciam maiúsculas são
+    confirmadas nos bytes originais, no mesmo offset. As fatias se sobrepõem
+    pelo tamanho do maior padrão. Cada assinatura é reportada uma vez, no offset
+    da primeira ocorrência: a alternação é recompilada só com as que faltam e a
+    varredura termina quando todas já apareceram.
+    """
+
+    def __init__(self, signatures):
+        self.signatures = tuple(signatures)
+        empty = [sig.name for sig in self.signatures if not sig.pattern]
+        if empty:
+            # Um padrão vazio vira uma alternativa vazia, que casa no offset 0 de qualquer corpo
+            raise ValueError(f"assinaturas com padrão vazio: {', '.join(empty)}")
+        self._raw = [sig.pattern.encode('utf-8') for sig in self.signatures]
+        self._lower = [raw.lower() for raw in self._raw]
+        self.overlap = max(map(len, self._raw), default=1) - 1
+
+    @property
+    def signature(self) -> str:
+        """Hash do conjunto de regras: muda sempre que uma assinatura é incluída, removida ou alterada."""
+        return hashlib.sha256(repr(self.signatures).encode('utf-8')).hexdigest()[:12]
+
+    def _alternation(self, pending: list):
+        if not pending:
+            return None
+        return re.compile(b'|'.join(re.escape(n) for n in dict.fromkeys(self._lower[i] for i in pending)))
+
+    def _matches_at(self, i: int, buf: bytes, lower: bytes, pos: int) -> bool:
+        if not lower.startswith(self._lower[i], pos):
+            return False
+        return self.signatures[i].ignore_case or buf.startswith(self._raw[i], pos)
+
+    def scan(self, chunks) -> list:
+        """Varre `chunks` (bytes ou iterável de fatias) e retorna as SignatureMatch na ordem das assinaturas."""
+        if isinstance(chunks, (bytes, bytearray, memoryview)):
+            chunks = (chunks,)
+        found: dict[int, int] = {}
+        pending = list(range(len(self.signatures)))
+        pattern = self._alternation(pending)
+        buf, base = b'', 0
+        for chunk in itertools.chain(chunks, (None,)):
+            if pattern is None:
+                break
+            final = chunk is None
+            if not final:
+                buf += chunk
+            # Ocorrências que começam depois de `limit` podem continuar na próxima fatia
+            limit = len(buf) if final else len(buf) - self.overlap
+            lower = buf.lower()
+            pos = 0
+            while pattern is not None and pos < limit:
+                m = pattern.search(lower, pos)
+                if m is None or m.start() >= limit:
+                    break
+                # Várias assinaturas podem começar no mesmo byte (ex.: password/passwordHash)
+                hits = [i for i in pending if self._matches_at(i, buf, lower, m.start())]
+                if hits:
+                    for i in hits:
+                        found[i] = base + m.start()
+                    pending = [i for i in pending if i not in found]
+                    pattern = self._alternation(pending)
+                pos = m.start() + 1
+            if limit > 0:
+                buf, base = buf[limit:], base + limit
+        return [SignatureMatch(self.signatures[i], found[i]) for i in sorted(found)]
+
+
+# Assinaturas estáticas, casadas uma vez por resposta (ScanResponse.signature_matches)
+RESPONSE_SIGNATURES = SignatureEngine([
+    # Chaves/valores sensíveis em respostas JSON (health, configs)
+    *(Signature(f'leak.{key}', key, 'leak', ignore_case=True)
+      for key in ('database', 'redis', 'env', 'config', 'secret', 'key', 'password', 'token')),
+    # Detalhes internos em páginas de erro
+    Signature('error.stack', 'stack', 'error', 'stack trace', ignore_case=True),
+    Signature('error.node-modules', 'node_modules', 'error', 'node_modules path'),
+    Signature('error.ts-source', '.ts:', 'error', 'source file path'),
+    Signature('error.sql-select', 'SELECT', 'error', 'SQL query'),
+    Signature('error.sql-from', 'FROM', 'error', 'SQL query'),
+    # Nomes do backend em mensagens de erro
+    *(Signature(f'internal.{name}', name, 'internal') for name in ('internal', 'postgresql', 'drizzle', 'neon')),
+])
+
+
+# Suites que classificam respostas com RESPONSE_SIGNATURES (entram na assinatura do --since-baseline)
+SUITE_SIGNATURES = {
+    'test_reconnaissance': RESPONSE_SIGNATURES,
+    'test_data_exposure': RESPONSE_SIGNATURES,
+}
+
+
+def reflection_engine(name: str, payloads) -> SignatureEngine:
+    """Assinaturas de reflexão para payloads enviados (diferenciam maiúsculas; vazios são ignorados)."""
+    return SignatureEngine(Signature(name, payload, 'reflection') for payload in payloads if payload)
+
+
+# ============================================================================
+# ENGINES DE REQUISIÇÃO
+# ============================================================================
+
+# Quantis publicados nas métricas de latência
+LATENCY_QUANTILES = (0.5, 0.95, 0.99)
+
+DEFAULT_HEADERS = {
+    'User-Agent': USER_AGENT,
+    'Accept': 'application/json',
+    'Content-Type': 'application/json',
+}
+
+
+class ScanResponse:
+    """Resposta HTTP independente do engine (subconjunto de requests.Response usado pelos testes)."""
+
+    __slots__ = ('status_code', 'headers', 'content', 'url', 'encoding', '_json', '_matches')
+
+    _UNPARSED = object()
+
+    def __init__(self, status_code: int, headers, content: bytes, url: str):
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers)
+        self.content = content
+        self.url = url
+        self.encoding = get_encoding_from_headers(self.headers)
+        self._json = self._UNPARSED
+        self._matches = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    def __bool__(self) -> bool:
+        # Mesma semântica de requests.Response: respostas 4xx/5xx são falsy
+        return self.ok
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding or 'utf-8', errors='replace')
+
+    def json(self):
+        # Memoizado: respostas em cache são lidas por várias suites
+        if self._json is self._UNPARSED:
+            try:
+                self._json = json.loads(self.content if self.encoding is None else self.text)
+            except ValueError as e:
+                raise requests.exceptions.JSONDecodeError(e.msg, e.doc, e.pos)
+        return self._json
+
+    def iter_chunks(self, size: int = SIGNATURE_CHUNK):
+        """Corpo em fatias UTF-8 para o SignatureEngine, sem copiar respostas UTF-8/ASCII."""
+        body = self.content
+        try:
+            native = codecs.lookup(self.encoding or 'utf-8').name in ('utf-8', 'ascii')
+        except LookupError:
+            native = True
+        if not native:
+            body = self.text.encode('utf-8')
+        view = memoryview(body)
+        for start in range(0, len(view), size):
+            yield view[start:start + size]
+
+    def scan(self, engine: 'SignatureEngine') -> list:
+        return engine.scan(self.iter_chunks())
+
+    def signature_matches(self) -> dict:
+        """RESPONSE_SIGNATURES casadas no corpo, por nome; memoizado como json()."""
+        if self._matches is None:
+            self._matches = {m.signature.name: m for m in self.scan(RESPONSE_SIGNATURES)}
+        return self._matches
+
+
+class ResponseCache:
+    """Cache LRU com TTL das respostas de probes idempotentes, válido por um scan.
+
+    A chave combina método, URL, headers da requisição e hash do corpo. Respostas
+    429 e 5xx não são guardadas, pois refletem o estado momentâneo do servidor.
+    """
+
+    def __init__(self, ttl: float = CACHE_TTL, max_entries: int = CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[str, tuple[float, ScanResponse]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(method: str, url: str, kwargs: dict) -> Optional[str]:
+        if method.upper() not in CACHEABLE_METHODS:
+            return None
+        headers = sorted((k.lower(), str(v)) for k, v in (kwargs.get('headers') or {}).items())
+        if kwargs.get('json') is not None:
+            body = json.dumps(kwargs['json'], sort_keys=True, default=str).encode()
+        else:
+            body = kwargs.get('data') or b''
+            body = body.encode() if isinstance(body, str) else bytes(body)
+        return json.dumps([method.upper(), url, headers, hashlib.sha256(body).hexdigest()])
+
+    def get(self, key: str) -> Optional[ScanResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and time.monotonic() - entry[0] <= self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: str, response: ScanResponse):
+        if response.status_code == 429 or response.status_code >= 500:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'enabled': True,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups * 100, 1) if lookups else 0.0,
+            'requests_saved': self.hits,
+            'evictions': self.evictions,
+            'entries': len(self._entries),
+            'ttl_s': self.ttl,
+            'max_entries': self.max_entries,
+        }
+
+
+def _backoff_time(retry_number: int) -> float:
+    """Backoff exponencial no mesmo formato do urllib3 Retry (primeira repetição imediata)."""
+    return 0.0 if retry_number <= 1 else RETRY_BACKOFF * (2 ** (retry_number - 1))
+
+
+@dataclass
+class TransportSample:
+    """Medição de transporte de uma requisição, preenchida pelo engine."""
+    elapsed_ms: float = 0.0
+    bytes_out: int = 0            # Bytes de corpo enviados
+    bytes_in: int = 0             # Bytes de corpo recebidos
+    retries: int = 0
+    timed_out: bool = False
+    new_connection: Optional[bool] = None   # None = engine não soube dizer
+
+
+# Contadores por thread de conexões abertas e repetições feitas pelo urllib3 (ver _TrackedAdapter)
+_CONNECTIONS = threading.local()
+
+
+class _TrackedRetry(Retry):
+    """Retry que anota quantas repetições já fez, inclusive quando desiste com MaxRetryError."""
+
+    def increment(self, *args, **kwargs):
+        _CONNECTIONS.retries = len(self.history)
+        new_retry = super().increment(*args, **kwargs)
+        _CONNECTIONS.retries = len(new_retry.history)
+        return new_retry
+
+
+class _TrackedHTTPConnection(urllib3.connection.HTTPConnection):
+    def connect(self):
+        _CONNECTIONS.opened = getattr(_CONNECTIONS, 'opened', 0) + 1
+        super().connect()
+
+
+class _TrackedHTTPSConnection(urllib3.connection.HTTPSConnection):
+    def connect(self):
+        _CONNECTIONS.opened = getattr(_CONNECTIONS, 'opened', 0) + 1
+        super().connect()
+
+
+class _TrackedHTTPConnectionPool(urllib3.HTTPConnectionPool):
+    ConnectionCls = _TrackedHTTPConnection
+
+
+class _TrackedHTTPSConnectionPool(urllib3.HTTPSConnectionPool):
+    ConnectionCls = _TrackedHTTPSConnection
+
+
+class _TrackedAdapter(HTTPAdapter):
+    """HTTPAdapter cujas conexões avisam quando são abertas, para separar conexão nova de reuso."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _TrackedHTTPConnectionPool,
+            'https': _TrackedHTTPSConnectionPool,
+        }
+
+
+class SyncEngine:
+    """Engine bloqueante: uma requests.Session com pool de conexões e Retry do urllib3."""
+
+    name = 'sync'
+
+    def __init__(self):
         self.session = self._create_session()
 
     def _create_session(self) -> requests.Session:
         session = requests.Session()
-        session.headers.update({
-            'User-Agent': USER_AGENT,
-            'Accept': 'application/json',
-            'Content-Type': 'application/json',
-        })
-        retry = Retry(total=2, backoff_factor=0.5, status_forcelist=[502, 503, 504])
-        adapter = HTTPAdapter(max_retries=retry, pool_connections=MAX_WORKERS, pool_maxsize=MAX_WORKERS)
+        session.headers.update(DEFAULT_HEADERS)
+        retry = _TrackedRetry(total=RETRY_TOTAL, backoff_factor=RETRY_BACKOFF, status_forcelist=list(RETRY_STATUSES))
+        adapter = _TrackedAdapter(max_retries=retry, pool_connections=MAX_WORKERS,
+                                  pool_maxsize=max(MAX_WORKERS, CONCURRENT_PROBE_CONNECTIONS))
         session.mount('http://', adapter)
         session.mount('https://', adapter)
         return session
 
+    def _send(self, call: tuple) -> tuple:
+        method, url, kwargs = call
+        sample = TransportSample()
+        _CONNECTIONS.opened = _CONNECTIONS.retries = 0
+        start = time.perf_counter()
+        try:
+            r = self.session.request(method, url, **kwargs)
+            result = ScanResponse(r.status_code, r.headers, r.content, r.url)
+            body = r.request.body or b''
+            sample.bytes_out = len(body.encode('utf-8') if isinstance(body, str) else body)
+            sample.bytes_in = len(r.content)
+        except requests.exceptions.RequestException as e:
+            result = e
+            # Timeout de leitura esgotado no Retry chega como ConnectionError(MaxRetryError(ReadTimeoutError))
+            reason = e.args[0] if e.args else None
+            reason = getattr(reason, 'reason', reason)
+            sample.timed_out = (isinstance(e, requests.exceptions.Timeout)
+                                or isinstance(reason, urllib3.exceptions.TimeoutError))
+        sample.retries = _CONNECTIONS.retries
+        sample.elapsed_ms = (time.perf_counter() - start) * 1000
+        sample.new_connection = _CONNECTIONS.opened > 0
+        return result, sample
+
+    def request(self, method: str, url: str, **kwargs) -> ScanResponse:
+        result, _ = self._send((method, url, kwargs))
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def request_many(self, calls: list, concurrency: Optional[int] = None) -> list:
+        """Retorna `(resposta ou exceção, TransportSample)` para cada chamada, na ordem de `calls`."""
+        if not concurrency or concurrency <= 1:
+            return [self._send(c) for c in calls]
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            return list(executor.map(self._send, calls))
+
+    def close(self):
+        self.session.close()
+
+
+class AsyncEngine:
+    """Engine asyncio/aiohttp: loop dedicado em thread própria e um único pool de conexões.
+
+    Cada host tem um semáforo com `host_concurrency` vagas, para o scan continuar
+    educado mesmo quando dezenas de probes são disparados de uma vez.
+    """
+
+    name = 'async'
+
+    def __init__(self, host_concurrency: int = HOST_CONCURRENCY):
+        self.host_concurrency = max(1, host_concurrency)
+        self._host_limits: dict[str, asyncio.Semaphore] = {}
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name='scanner-aiohttp', daemon=True)
+        self._thread.start()
+        self._session = self._call(self._open())
+
+    def _call(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    async def _open(self):
+        # Com repetições, basta uma tentativa ter aberto conexão para a requisição contar como nova
+        async def on_create(session, ctx, params):
+            ctx.trace_request_ctx.new_connection = True
+
+        async def on_reuse(session, ctx, params):
+            ctx.trace_request_ctx.new_connection = ctx.trace_request_ctx.new_connection or False
+
+        trace = aiohttp.TraceConfig()
+        trace.on_connection_create_end.append(on_create)
+        trace.on_connection_reuseconn.append(on_reuse)
+        connector = aiohttp.TCPConnector(limit=max(MAX_WORKERS, CONCURRENT_PROBE_CONNECTIONS), limit_per_host=0)
+        return aiohttp.ClientSession(connector=connector, trace_configs=[trace])
+
+    def _host_limit(self, url: str) -> asyncio.Semaphore:
+        host = url.split('://', 1)[-1].split('/', 1)[0]
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(self.host_concurrency)
+        return self._host_limits[host]
+
+    @staticmethod
+    def _prepare(kwargs: dict):
+        """Traduz kwargs no formato requests para headers/corpo/timeout do aiohttp."""
+        headers = CaseInsensitiveDict(DEFAULT_HEADERS)
+        headers.update(kwargs.get('headers') or {})
+        body = None
+        if kwargs.get('json') is not None:
+            body = json.dumps(kwargs['json'], allow_nan=False).encode('utf-8')
+        elif kwargs.get('data'):
+            data = kwargs['data']
+            body = data.encode('utf-8') if isinstance(data, str) else data
+        timeout = kwargs.get('timeout', REQUEST_TIMEOUT)
+        return dict(headers), body, aiohttp.ClientTimeout(total=None, sock_connect=timeout, sock_read=timeout)
+
+    async def _fetch(self, method: str, url: str, kwargs: dict, sample: TransportSample) -> ScanResponse:
+        headers, body, timeout = self._prepare(kwargs)
+        sample.bytes_out = len(body or b'')
+        while True:
+            try:
+                async with self._session.request(method, url, headers=headers, data=body,
+                                                 timeout=timeout, trace_request_ctx=sample) as resp:
+                    content = await resp.read()
+                    merged = {k: ', '.join(resp.headers.getall(k)) for k in resp.headers.keys()}
+                    response = ScanResponse(resp.status, merged, content, str(resp.url))
+                    sample.bytes_in = len(content)
+            except asyncio.TimeoutError as e:
+                # Mesmo critério do urllib3: timeout de conexão sempre repete, o de leitura só em método idempotente
+                connect = isinstance(e, getattr(aiohttp, 'ConnectionTimeoutError', ()))   # aiohttp >= 3.10
+                if sample.retries >= RETRY_TOTAL or not (connect or method.upper() in RETRY_METHODS):
+                    sample.timed_out = True
+                    raise requests.exceptions.Timeout(f"{method} {url}: timeout") from e
+            except aiohttp.ClientConnectorError as e:
+                if sample.retries >= RETRY_TOTAL:
+                    raise requests.exceptions.ConnectionError(f"{method} {url}: {e}") from e
+            except aiohttp.ClientError as e:
+                raise requests.exceptions.ConnectionError(f"{method} {url}: {e}") from e
+            else:
+                if response.status_code not in RETRY_STATUSES or method.upper() not in RETRY_METHODS:
+                    return response
+                if sample.retries >= RETRY_TOTAL:
+                    raise requests.exceptions.RetryError(f"{method} {url}: too many {response.status_code} responses")
+            sample.retries += 1
+            await asyncio.sleep(_backoff_time(sample.retries))
+
+    async def _limited(self, method: str, url: str, kwargs: dict, limit: asyncio.Semaphore) -> tuple:
+        async with limit or self._host_limit(url):
+            sample = TransportSample()
+            start = time.perf_counter()
+            try:
+                result = await self._fetch(method, url, kwargs, sample)
+            except requests.exceptions.RequestException as e:
+                result = e
+            sample.elapsed_ms = (time.perf_counter() - start) * 1000
+            return result, sample
+
+    async def _gather(self, calls: list, concurrency: Optional[int]):
+        # Um limite explícito (probes de carga) substitui o limite educado por host
+        limit = asyncio.Semaphore(concurrency) if concurrency else None
+        return await asyncio.gather(*(self._limited(m, u, kw, limit) for m, u, kw in calls))
+
+    def request(self, method: str, url: str, **kwargs) -> ScanResponse:
+        result, _ = self.request_many([(method, url, kwargs)])[0]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def request_many(self, calls: list, concurrency: Optional[int] = None) -> list:
+        """Retorna `(resposta ou exceção, TransportSample)` para cada chamada, na ordem de `calls`."""
+        return self._call(self._gather(calls, concurrency))
+
+    def close(self):
+        self._call(self._session.close())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+
+
+def create_engine(name: str = 'sync', host_concurrency: int = HOST_CONCURRENCY):
+    if name == 'async':
+        if aiohttp is not None:
+            return AsyncEngine(host_concurrency)
+        print("[!] aiohttp não instalado — usando engine síncrono.")
+    return SyncEngine()
+
+
+def _percentile(sorted_values: list, q: float) -> float:
+    """Percentil pelo método nearest-rank."""
+    if not sorted_values:
+        return 0.0
+    rank = -(-round(q * 1000) * len(sorted_values) // 1000)   # ceil(q * n) sem erro de float
+    return round(sorted_values[max(rank, 1) - 1], 1)
+
+
+class _TransportBucket:
+    __slots__ = ('latencies', 'bytes_in', 'bytes_out', 'retries', 'timeouts', 'errors',
+                 'new_connections', 'reused_connections', 'cache_hits')
+
+    def __init__(self):
+        self.latencies: list[float] = []
+        self.bytes_in = self.bytes_out = self.retries = self.timeouts = self.errors = 0
+        self.new_connections = self.reused_connections = self.cache_hits = 0
+
+    def add(self, other: '_TransportBucket'):
+        self.latencies.extend(other.latencies)
+        for name in self.__slots__[1:]:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+
+    def summary(self) -> dict:
+        ordered = sorted(self.latencies)
+        data = {'requests': len(ordered)}
+        for q in LATENCY_QUANTILES:
+            data[f"p{int(q * 100)}_ms"] = _percentile(ordered, q)
+        data['max_ms'] = round(ordered[-1], 1) if ordered else 0.0
+        data.update({name: getattr(self, name) for name in self.__slots__[1:]})
+        return data
+
+
+class TransportStats:
+    """Métricas de transporte por (suite, endpoint), alimentadas automaticamente pelo _req.
+
+    Também serve de canário barato de latência da API: os percentis saem no
+    relatório e, opcionalmente, no formato texto do Prometheus.
+    """
+
+    def __init__(self):
+        self._buckets: dict[tuple[str, str], _TransportBucket] = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, suite: str, endpoint: str) -> _TransportBucket:
+        key = (suite, endpoint)
+        if key not in self._buckets:
+            self._buckets[key] = _TransportBucket()
+        return self._buckets[key]
+
+    def record(self, suite: str, endpoint: str, sample: TransportSample, failed: bool = False):
+        with self._lock:
+            bucket = self._bucket(suite, endpoint)
+            bucket.latencies.append(sample.elapsed_ms)
+            bucket.bytes_in += sample.bytes_in
+            bucket.bytes_out += sample.bytes_out
+            bucket.retries += sample.retries
+            bucket.timeouts += sample.timed_out
+            bucket.errors += failed
+            if sample.new_connection is not None:
+                bucket.new_connections += sample.new_connection
+                bucket.reused_connections += not sample.new_connection
+
+    def record_cache_hit(self, suite: str, endpoint: str):
+        with self._lock:
+            self._bucket(suite, endpoint).cache_hits += 1
+
+    def _grouped(self, index: int) -> dict:
+        grouped: dict[str, _TransportBucket] = {}
+        for key, bucket in self._buckets.items():
+            grouped.setdefault(key[index], _TransportBucket()).add(bucket)
+        return grouped
+
+    def summary(self) -> dict:
+        with self._lock:
+            total = _TransportBucket()
+            for bucket in self._buckets.values():
+                total.add(bucket)
+            return {
+                'totals': total.summary(),
+                'suites': {name: b.summary() for name, b in self._grouped(0).items()},
+                'endpoints': {name: b.summary() for name, b in sorted(self._grouped(1).items())},
+            }
+
+    def prometheus(self, target: str) -> str:
+        """Exporta as métricas no formato texto de exposição do Prometheus."""
+        def label(value: str) -> str:
+            return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+        counters = [
+            ('requests_total', 'Requisições enviadas pelo scanner externo', lambda b: len(b.latencies)),
+            ('bytes_in_total', 'Bytes de corpo recebidos', lambda b: b.bytes_in),
+            ('bytes_out_total', 'Bytes de corpo enviados', lambda b: b.bytes_out),
+            ('retries_total', 'Repetições disparadas pelo Retry', lambda b: b.retries),
+            ('timeouts_total', 'Requisições que estouraram o timeout', lambda b: b.timeouts),
+            ('errors_total', 'Requisições sem resposta', lambda b: b.errors),
+            ('new_connections_total', 'Conexões novas abertas', lambda b: b.new_connections),
+            ('reused_connections_total', 'Requisições em conexão reaproveitada', lambda b: b.reused_connections),
+            ('cache_hits_total', 'Respostas servidas pelo cache do scan', lambda b: b.cache_hits),
+        ]
+        with self._lock:
+            items = sorted(self._buckets.items())
+            lines = []
+            for name, help_text, value in counters:
+                lines.append(f"# HELP fandreams_scanner_{name} {help_text}")
+                lines.append(f"# TYPE fandreams_scanner_{name} counter")
+                for (suite, endpoint), bucket in items:
+                    labels = f'target="{label(target)}",suite="{label(suite)}",endpoint="{label(endpoint)}"'
+                    lines.append(f"fandreams_scanner_{name}{{{labels}}} {value(bucket)}")
+            lines.append("# HELP fandreams_scanner_request_latency_ms Latência das requisições em ms")
+            lines.append("# TYPE fandreams_scanner_request_latency_ms summary")
+            for (suite, endpoint), bucket in items:
+                labels = f'target="{label(target)}",suite="{label(suite)}",endpoint="{label(endpoint)}"'
+                ordered = sorted(bucket.latencies)
+                for q in LATENCY_QUANTILES:
+                    lines.append(f'fandreams_scanner_request_latency_ms{{{labels},quantile="{q}"}} '
+                                 f'{_percentile(ordered, q)}')
+                lines.append(f"fandreams_scanner_request_latency_ms_sum{{{labels}}} {round(sum(ordered), 1)}")
+                lines.append(f"fandreams_scanner_request_latency_ms_count{{{labels}}} {len(ordered)}")
+        return '\n'.join(lines) + '\n'
+
+
+class SecurityScanner:
+    """Scanner de segurança externo para a API FanDreams."""
+
+    def __init__(self, target: str, verbose: bool = False, engine: str = 'sync',
+                 concurrency: int = HOST_CONCURRENCY, cache: Optional[ResponseCache] = None,
+                 load_cap: Optional[int] = None, stream: Optional[EventStream] = None,
+                 corpora: Optional[dict] = None):
+        self.target = target.rstrip('/')
+        self.base_url = f"{self.target}/api/v1"
+        self.verbose = verbose
+        self.findings: list[Finding] = []
+        self.results: list[TestResult] = []
+        self.engine = create_engine(engine, concurrency)
+        self.cache = cache
+        self.load_cap = load_cap    # Teto para os probes de carga (modo frota)
+        self.stream = stream
+        self.corpora: dict[str, PayloadCorpus] = corpora or load_corpora()
+        self.restored_metrics: dict = {}    # transport/cache do scan_end, em from_stream
+        self.transport = TransportStats()
+        self.suite_runs: list[SuiteRun] = []
+        self.reused_runs: dict[str, SuiteRun] = {}
+        self._suite = threading.local()
+
     def log(self, msg: str):
         if self.verbose:
             print(f"  [>] {msg}")
 
-    def _req(self, method: str, path: str, **kwargs) -> Optional[requests.Response]:
-        url = f"{self.base_url}{path}"
-        kwargs.setdefault('timeout', REQUEST_TIMEOUT)
-        try:
-            return self.session.request(method, url, **kwargs)
-        except requests.exceptions.RequestException as e:
-            self.log(f"Request failed: {e}")
-            return None
+    def _req(self, method: str, path: str, cache: bool = True, **kwargs) -> Optional[ScanResponse]:
+        return self._req_many([(method, path, kwargs)], cache=cache)[0]
+
+    def _req_many(self, calls: list, concurrency: Optional[int] = None,
+                  cache: bool = True) -> list[Optional[ScanResponse]]:
+        """Envia probes independentes `(method, path, kwargs)` pelo engine.
+
+        As respostas voltam na mesma ordem de `calls`, então os testes avaliam
+        os resultados exatamente como no laço sequencial. `concurrency` é usado
+        só pelos testes de carga e substitui o limite por host do engine.
+        Testes que precisam de tráfego real (floods, contagem de 429) passam
+        `cache=False`.
+        """
+        if concurrency and self.load_cap:
+            concurrency = min(concurrency, self.load_cap)
+        run = getattr(self._suite, 'run', None)
+        suite = run.name if run else 'scan'
+        if run:
+            self._suite.sent += len(calls)     # Probes do teste em curso, inclusive os servidos pelo cache
+        endpoints = [f"{method.upper()} {path.split('?', 1)[0]}" for method, path, _ in calls]
+        responses: list[Optional[ScanResponse]] = [None] * len(calls)
+        keys: list[Optional[str]] = [None] * len(calls)
+        pending, prepared = [], []
+        for i, (method, path, kwargs) in enumerate(calls):
+            kwargs = dict(kwargs)
+            kwargs.setdefault('timeout', REQUEST_TIMEOUT)
+            url = f"{self.base_url}{path}"
+            if cache and self.cache is not None:
+                keys[i] = self.cache.key(method, url, kwargs)
+                hit = self.cache.get(keys[i]) if keys[i] else None
+                if hit is not None:
+                    responses[i] = hit
+                    self.transport.record_cache_hit(suite, endpoints[i])
+                    continue
+            pending.append(i)
+            prepared.append((method, url, kwargs))
+
+        results = self.engine.request_many(prepared, concurrency) if prepared else []
+        for i, (result, sample) in zip(pending, results):
+            failed = isinstance(result, Exception)
+            self.transport.record(suite, endpoints[i], sample, failed=failed)
+            if failed:
+                self.log(f"Request failed: {result}")
+                continue
+            responses[i] = result
+            if keys[i]:
+                self.cache.put(keys[i], result)
+        return responses
+
+    def close(self):
+        self.engine.close()
+
+    def _emit(self, event: str, **data):
+        if self.stream is not None:
+            self.stream.emit(event, **data)
+
+    def _emit_record(self, event: str, record, run: Optional[SuiteRun]):
+        if self.stream is not None:
+            self.stream.emit(event, suite=run.name if run else 'scan', run_id=run.run_id if run else '',
+                             data=asdict(record))
 
     def add_finding(self, **kwargs):
-        self.findings.append(Finding(**kwargs))
+        run = getattr(self._suite, 'run', None)
+        finding = Finding(**kwargs)
+        (run.findings if run else self.findings).append(finding)
+        self._emit_record('finding', finding, run)
 
     def add_result(self, **kwargs):
-        self.results.append(TestResult(**kwargs))
+        run = getattr(self._suite, 'run', None)
+        if run:
+            # Sem medição explícita, duração e requisições são as acumuladas desde o resultado anterior da suite
+            now = time.perf_counter()
+            kwargs.setdefault('duration_ms', (now - self._suite.checkpoint) * 1000)
+            kwargs.setdefault('requests_sent', self._suite.sent)
+            self._suite.checkpoint = now
+            self._suite.sent = 0
+        result = TestResult(**kwargs)
+        (run.results if run else self.results).append(result)
+        self._emit_record('result', result, run)
 
     # ========================================================================
     # [RECON] RECONHECIMENTO — MITRE TA0043
@@ -167,13 +1328,15 @@ class SecurityScanner:
 
         if r:
             data = r.json() if r.status_code == 200 else {}
+            matches = r.signature_matches() if r.status_code == 200 else {}
+            leaked = [str(matches[name]) for name in ('leak.secret', 'leak.database') if name in matches]
             self.add_result(
                 test_name="Health endpoint info disclosure",
                 category="RECON",
-                passed='secret' not in json.dumps(data).lower() and 'database' not in json.dumps(data).lower(),
-                details=f"Status: {r.status_code}, Keys: {list(data.keys())}",
+                passed=not leaked,
+                details=f"Status: {r.status_code}, Keys: {list(data.keys())}"
+                        + (f", Signatures: {leaked}" if leaked else ""),
                 duration_ms=elapsed,
-                requests_sent=1,
                 status_codes=[r.status_code]
             )
 
@@ -198,7 +1361,6 @@ class SecurityScanner:
                 category="RECON",
                 passed=False,
                 details="Target unreachable",
-                requests_sent=1,
             )
 
         # Test server headers
@@ -210,7 +1372,6 @@ class SecurityScanner:
                 category="RECON",
                 passed=server == 'Not Set' and x_powered == 'Not Set',
                 details=f"Server: {server}, X-Powered-By: {x_powered}",
-                requests_sent=0,
             )
             if x_powered != 'Not Set':
                 self.add_finding(
@@ -235,18 +1396,14 @@ class SecurityScanner:
             '/api/v1/debug', '/graphql', '/api/graphql',
             '/.well-known/security.txt', '/robots.txt', '/sitemap.xml',
         ]
-        leaked = []
-        for path in leak_paths:
-            r = self._req('GET', path.replace('/api/v1', ''))
-            if r and r.status_code == 200:
-                leaked.append(path)
+        responses = self._req_many([('GET', path.replace('/api/v1', ''), {}) for path in leak_paths])
+        leaked = [path for path, r in zip(leak_paths, responses) if r and r.status_code == 200]
 
         self.add_result(
             test_name="Sensitive path exposure",
             category="RECON",
             passed=len(leaked) == 0,
             details=f"Exposed paths: {leaked}" if leaked else "No sensitive paths exposed",
-            requests_sent=len(leak_paths),
         )
         print(f"  [{'✗' if leaked else '✓'}] Sensitive paths: {leaked if leaked else 'None found'}")
 
@@ -259,21 +1416,16 @@ class SecurityScanner:
         print("=" * 60)
 
         # Test 1: Login brute force
-        common_passwords = [
-            'password', '123456', '12345678', 'admin', 'letmein',
-            'welcome', 'monkey', '1234567', 'dragon', '111111',
-            'baseball', 'master', 'qwerty', 'abc123', 'login',
-            'admin123', 'Password1', 'p@ssw0rd', '1q2w3e4r',
-            'passw0rd',
-        ]
-
+        passwords = self.corpora['passwords']
         target_email = 'admin@fandreams.app'
         statuses = []
+        attempts = 0
         rate_limited_count = 0
         start = time.time()
 
-        print(f"  [>] Testando {len(common_passwords)} senhas contra {target_email}...")
-        for pwd in common_passwords:
+        print(f"  [>] Testando senhas de {passwords.version} contra {target_email}...")
+        for pwd in passwords:
+            attempts += 1
             r = self._req('POST', '/auth/login', json={
                 'email': target_email,
                 'password': pwd
@@ -289,11 +1441,12 @@ class SecurityScanner:
                         title="Weak credentials discovered via brute force",
                         description=f"Login succeeded with password from common list",
                         endpoint="/api/v1/auth/login",
-                        evidence=f"Password found in top 20 common passwords",
+                        evidence=f"Password #{attempts} of the common password corpus",
                         mitre_id="T1110.001",
                         owasp_id="A07:2021",
                         remediation="Enforce strong password policy, implement account lockout",
-                        cvss_estimate=9.0
+                        cvss_estimate=9.0,
+                        corpus=passwords.version
                     )
                     break
 
@@ -308,7 +1461,6 @@ class SecurityScanner:
             details=f"Rate limited: {rate_limited_count}/{len(statuses)} requests. "
                     f"Statuses: {dict(zip(*[list(set(statuses)), [statuses.count(s) for s in set(statuses)]]))}" if statuses else "No responses",
             duration_ms=elapsed,
-            requests_sent=len(common_passwords),
             status_codes=statuses
         )
         print(f"  [{'✓' if rate_limit_effective else '!'}] Rate limiting: {rate_limited_count}/{len(statuses)} blocked")
@@ -344,7 +1496,6 @@ class SecurityScanner:
             category="AUTH",
             passed=stuffing_blocked > 0,
             details=f"Blocked: {stuffing_blocked}/{len(stuffing_statuses)}",
-            requests_sent=20,
             status_codes=stuffing_statuses
         )
         print(f"  [{'✓' if stuffing_blocked > 0 else '!'}] Credential stuffing blocked: {stuffing_blocked}/20")
@@ -363,7 +1514,6 @@ class SecurityScanner:
                 category="AUTH",
                 passed=same_message,
                 details=f"Non-existent: '{msg1}' vs Existing: '{msg2}'",
-                requests_sent=2,
             )
             print(f"  [{'✓' if same_message else '✗'}] Email enumeration: {'Same error message' if same_message else 'DIFFERENT messages!'}")
             if not same_message:
@@ -401,7 +1551,6 @@ class SecurityScanner:
             category="JWT",
             passed=none_blocked,
             details=f"Status: {r.status_code if r else 'no response'}",
-            requests_sent=1,
             status_codes=[r.status_code] if r else []
         )
         print(f"  [{'✓' if none_blocked else '✗'}] alg:none attack: {'Blocked' if none_blocked else 'VULNERABLE!'}")
@@ -465,7 +1614,6 @@ class SecurityScanner:
             category="JWT",
             passed=True,  # Passed if no weak secret found
             details=f"Tested {len(weak_secrets)} common secrets, none accepted",
-            requests_sent=len(weak_secrets),
         )
         print(f"  [✓] Weak secret bruteforce: {len(weak_secrets)} secrets tested, none worked")
 
@@ -485,7 +1633,6 @@ class SecurityScanner:
             category="JWT",
             passed=expired_blocked,
             details=f"Status: {r.status_code if r else 'no response'}",
-            requests_sent=1,
         )
         print(f"  [{'✓' if expired_blocked else '✗'}] Expired token: {'Rejected' if expired_blocked else 'ACCEPTED!'}")
 
@@ -498,7 +1645,6 @@ class SecurityScanner:
             category="JWT",
             passed=tamper_blocked,
             details=f"Status: {r.status_code if r else 'no response'}",
-            requests_sent=1,
         )
         print(f"  [{'✓' if tamper_blocked else '✗'}] Tampered token: {'Rejected' if tamper_blocked else 'ACCEPTED!'}")
 
@@ -510,65 +1656,54 @@ class SecurityScanner:
         print("\n[4/12] ATAQUES DE INJEÇÃO (OWASP A03:2021)")
         print("=" * 60)
 
-        sql_payloads = [
-            "' OR '1'='1",
-            "'; DROP TABLE users;--",
-            "1' UNION SELECT * FROM users--",
-            "admin'--",
-            "1; DELETE FROM users WHERE 1=1",
-            "' AND (SELECT COUNT(*) FROM information_schema.tables) > 0--",
-            "') OR ('1'='1",
-            "' OR SLEEP(5)--",
-            "1' AND 1=CONVERT(int, (SELECT TOP 1 table_name FROM information_schema.tables))--",
-            "' UNION ALL SELECT NULL,password_hash,NULL FROM users--",
-        ]
-
-        nosql_payloads = [
-            {"$gt": ""},
-            {"$ne": None},
-            {"$regex": ".*"},
-            {"$where": "1==1"},
-        ]
+        sql_payloads, nosql_payloads = self.corpora['sql'], self.corpora['nosql']
 
         # SQL Injection in Login
-        print(f"  [>] Testando {len(sql_payloads)} payloads SQL em login...")
+        print(f"  [>] Testando payloads SQL de {sql_payloads.version} em login...")
         sql_vulnerable = False
-        error_500_count = 0
-        for payload in sql_payloads:
-            r = self._req('POST', '/auth/login', json={'email': payload, 'password': payload})
-            if r:
-                if r.status_code == 500:
-                    error_500_count += 1
-                    sql_vulnerable = True
-                if r.status_code == 200:
-                    sql_vulnerable = True
-                    self.add_finding(
-                        category="Injection",
-                        severity="CRITICAL",
-                        title="SQL Injection in login endpoint",
-                        description=f"Login succeeded with SQL payload: {payload}",
-                        endpoint="/api/v1/auth/login",
-                        evidence=f"Payload: {payload}, Status: {r.status_code}",
-                        mitre_id="T1190",
-                        owasp_id="A03:2021",
-                        remediation="Use parameterized queries, validate input types",
-                        cvss_estimate=9.8
-                    )
+        error_500_count = sql_sent = 0
+        for batch in sql_payloads.batches():
+            responses = self._req_many([
+                ('POST', '/auth/login', {'json': {'email': payload, 'password': payload}}) for payload in batch
+            ])
+            sql_sent += len(batch)
+            for payload, r in zip(batch, responses):
+                if r:
+                    if r.status_code == 500:
+                        error_500_count += 1
+                        sql_vulnerable = True
+                    if r.status_code == 200:
+                        sql_vulnerable = True
+                        self.add_finding(
+                            category="Injection",
+                            severity="CRITICAL",
+                            title="SQL Injection in login endpoint",
+                            description=f"Login succeeded with SQL payload: {payload}",
+                            endpoint="/api/v1/auth/login",
+                            evidence=f"Payload: {payload}, Status: {r.status_code}",
+                            mitre_id="T1190",
+                            owasp_id="A03:2021",
+                            remediation="Use parameterized queries, validate input types",
+                            cvss_estimate=9.8,
+                            corpus=sql_payloads.version
+                        )
 
         self.add_result(
             test_name="SQL Injection - Login",
             category="INJECTION",
             passed=not sql_vulnerable,
-            details=f"500 errors: {error_500_count}/{len(sql_payloads)}. {'VULNERABLE' if sql_vulnerable else 'Protected'}",
-            requests_sent=len(sql_payloads),
+            details=f"500 errors: {error_500_count}/{sql_sent}. {'VULNERABLE' if sql_vulnerable else 'Protected'}",
         )
         print(f"  [{'✗' if sql_vulnerable else '✓'}] SQL Injection login: {error_500_count} errors/500")
 
         # SQL Injection in search/query params
         print(f"  [>] Testando SQL injection em query params...")
         query_vulnerable = False
-        for payload in sql_payloads[:5]:
-            r = self._req('GET', f'/discover/search?q={requests.utils.quote(payload)}')
+        query_payloads = sql_payloads.take(5)
+        responses = self._req_many([
+            ('GET', f'/discover/search?q={requests.utils.quote(payload)}', {}) for payload in query_payloads
+        ])
+        for r in responses:
             if r and r.status_code == 500:
                 query_vulnerable = True
 
@@ -577,24 +1712,25 @@ class SecurityScanner:
             category="INJECTION",
             passed=not query_vulnerable,
             details="Protected" if not query_vulnerable else "500 errors detected",
-            requests_sent=5,
         )
         print(f"  [{'✗' if query_vulnerable else '✓'}] SQL Injection query: {'Vulnerable' if query_vulnerable else 'Protected'}")
 
         # NoSQL Injection
         print(f"  [>] Testando NoSQL injection...")
         nosql_vulnerable = False
-        for payload in nosql_payloads:
-            r = self._req('POST', '/auth/login', json={'email': payload, 'password': payload})
-            if r and r.status_code == 200:
-                nosql_vulnerable = True
+        for batch in nosql_payloads.batches():
+            responses = self._req_many([
+                ('POST', '/auth/login', {'json': {'email': payload, 'password': payload}}) for payload in batch
+            ])
+            for r in responses:
+                if r and r.status_code == 200:
+                    nosql_vulnerable = True
 
         self.add_result(
             test_name="NoSQL Injection - Login",
             category="INJECTION",
             passed=not nosql_vulnerable,
             details="Protected" if not nosql_vulnerable else "NoSQL injection succeeded",
-            requests_sent=len(nosql_payloads),
         )
         print(f"  [{'✗' if nosql_vulnerable else '✓'}] NoSQL Injection: {'Vulnerable' if nosql_vulnerable else 'Protected'}")
 
@@ -602,13 +1738,13 @@ class SecurityScanner:
         cmd_payloads = ['; ls -la', '| cat /etc/passwd', '$(whoami)', '`id`']
         print(f"  [>] Testando command injection em registro...")
         cmd_vulnerable = False
-        for payload in cmd_payloads:
-            r = self._req('POST', '/auth/register', json={
-                'email': f'cmd{int(time.time())}@test.com',
-                'password': 'Test1234',
-                'username': payload,
-                'dateOfBirth': '2000-01-01'
-            })
+        responses = self._req_many([('POST', '/auth/register', {'json': {
+            'email': f'cmd{int(time.time())}@test.com',
+            'password': 'Test1234',
+            'username': payload,
+            'dateOfBirth': '2000-01-01'
+        }}) for payload in cmd_payloads])
+        for r in responses:
             if r and r.status_code == 200:
                 cmd_vulnerable = True
 
@@ -617,7 +1753,6 @@ class SecurityScanner:
             category="INJECTION",
             passed=not cmd_vulnerable,
             details="Protected" if not cmd_vulnerable else "Command injection in username accepted",
-            requests_sent=len(cmd_payloads),
         )
         print(f"  [{'✗' if cmd_vulnerable else '✓'}] Command Injection: {'Vulnerable' if cmd_vulnerable else 'Protected'}")
 
@@ -632,7 +1767,8 @@ class SecurityScanner:
                 mitre_id="T1190",
                 owasp_id="A03:2021",
                 remediation="Ensure all SQL queries use parameterized statements, add input validation",
-                cvss_estimate=8.0
+                cvss_estimate=8.0,
+                corpus=sql_payloads.version
             )
 
     # ========================================================================
@@ -643,38 +1779,37 @@ class SecurityScanner:
         print("\n[5/12] ATAQUES XSS (OWASP A07:2021)")
         print("=" * 60)
 
-        xss_payloads = [
-            '<script>alert("XSS")</script>',
-            '<img src=x onerror=alert(1)>',
-            '<svg/onload=alert(1)>',
-            'javascript:alert(1)',
-            '"><img src=x onerror=alert(1)>',
-            "'><script>alert(document.cookie)</script>",
-            '<body onload=alert(1)>',
-            '<details open ontoggle=alert(1)>',
-            '<math><mtext><table><mglyph><style><!--</style><img src=x onerror=alert(1)>',
-            '<a href="data:text/html,<script>alert(1)</script>">click</a>',
-        ]
+        xss_payloads = self.corpora['xss']
 
         # Test XSS in search
-        print(f"  [>] Testando {len(xss_payloads)} payloads XSS em busca...")
+        print(f"  [>] Testando payloads XSS de {xss_payloads.version} em busca...")
         reflected = False
-        for payload in xss_payloads:
-            r = self._req('GET', f'/discover/search?q={requests.utils.quote(payload)}')
-            if r and payload in r.text:
-                reflected = True
-                self.add_finding(
-                    category="XSS",
-                    severity="HIGH",
-                    title="Reflected XSS in search endpoint",
-                    description=f"XSS payload reflected in search response",
-                    endpoint="/api/v1/discover/search",
-                    evidence=f"Payload reflected: {payload[:50]}",
-                    mitre_id="T1189",
-                    owasp_id="A07:2021",
-                    remediation="Encode all output, implement CSP headers",
-                    cvss_estimate=7.0
-                )
+        for batch in xss_payloads.batches():
+            responses = self._req_many([
+                ('GET', f'/discover/search?q={requests.utils.quote(payload)}', {}) for payload in batch
+            ])
+            for payload, r in zip(batch, responses):
+                # Cada resposta só é comparada com o payload que a gerou
+                hits = r.scan(reflection_engine('xss.reflection', [payload])) if r else []
+                if hits:
+                    reflected = True
+                    self.add_finding(
+                        category="XSS",
+                        severity="HIGH",
+                        title="Reflected XSS in search endpoint",
+                        description=f"XSS payload reflected in search response",
+                        endpoint="/api/v1/discover/search",
+                        evidence=f"Payload reflected: {payload[:50]}",
+                        mitre_id="T1189",
+                        owasp_id="A07:2021",
+                        remediation="Encode all output, implement CSP headers",
+                        cvss_estimate=7.0,
+                        corpus=xss_payloads.version,
+                        signature=hits[0].signature.name,
+                        signature_offset=hits[0].offset
+                    )
+                    break
+            if reflected:
                 break
 
         self.add_result(
@@ -682,14 +1817,13 @@ class SecurityScanner:
             category="XSS",
             passed=not reflected,
             details="No reflection detected" if not reflected else "XSS payload reflected!",
-            requests_sent=len(xss_payloads),
         )
         print(f"  [{'✗' if reflected else '✓'}] Reflected XSS: {'Found!' if reflected else 'Not reflected'}")
 
         # Test XSS in registration fields
         print(f"  [>] Testando Stored XSS em registro...")
         stored = False
-        for payload in xss_payloads[:3]:
+        for payload in xss_payloads.take(3):
             r = self._req('POST', '/auth/register', json={
                 'email': f'xss{int(time.time())}@test.com',
                 'password': 'Test1234',
@@ -711,7 +1845,8 @@ class SecurityScanner:
                         mitre_id="T1189",
                         owasp_id="A07:2021",
                         remediation="Sanitize or encode HTML entities in user-generated content fields",
-                        cvss_estimate=6.0
+                        cvss_estimate=6.0,
+                        corpus=xss_payloads.version
                     )
                     stored = True
                     break
@@ -721,7 +1856,6 @@ class SecurityScanner:
             category="XSS",
             passed=not stored,
             details="HTML content sanitized" if not stored else "HTML stored in displayName",
-            requests_sent=3,
         )
         print(f"  [{'!' if stored else '✓'}] Stored XSS displayName: {'Stored (needs frontend encoding)' if stored else 'Sanitized'}")
 
@@ -738,7 +1872,6 @@ class SecurityScanner:
                 category="XSS",
                 passed=has_protection,
                 details=f"CSP: {'Yes' if csp else 'No'}, X-XSS: {x_xss or 'No'}, nosniff: {x_ct}",
-                requests_sent=1,
             )
             print(f"  [{'✓' if has_protection else '✗'}] Headers: CSP={'Yes' if csp else 'No'}, X-XSS={x_xss or 'No'}, nosniff={x_ct}")
 
@@ -769,8 +1902,8 @@ class SecurityScanner:
 
         unprotected = []
         print(f"  [>] Testando {len(protected)} endpoints protegidos...")
-        for method, path in protected:
-            r = self._req(method, path)
+        responses = self._req_many([(method, path, {}) for method, path in protected])
+        for (method, path), r in zip(protected, responses):
             if r and r.status_code not in (401, 403):
                 unprotected.append(f"{method} {path} -> {r.status_code}")
 
@@ -779,7 +1912,6 @@ class SecurityScanner:
             category="AUTHZ",
             passed=len(unprotected) == 0,
             details=f"Unprotected: {unprotected}" if unprotected else "All endpoints protected",
-            requests_sent=len(protected),
         )
         print(f"  [{'✗' if unprotected else '✓'}] Auth required: {len(protected) - len(unprotected)}/{len(protected)} protected")
 
@@ -807,7 +1939,6 @@ class SecurityScanner:
             category="AUTHZ",
             passed=escalation_blocked,
             details=f"Status: {r.status_code if r else 'no response'}",
-            requests_sent=1,
         )
         print(f"  [{'✓' if escalation_blocked else '✗'}] Privilege escalation: {'Blocked' if escalation_blocked else 'VULNERABLE!'}")
 
@@ -822,15 +1953,8 @@ class SecurityScanner:
         # Test 1: Global rate limit (100 req/min)
         print(f"  [>] Flood test: 120 requests em burst...")
         start = time.time()
-        statuses = []
-
-        def make_request(_):
-            r = self._req('GET', '/health')
-            return r.status_code if r else 0
-
-        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-            results = list(executor.map(make_request, range(120)))
-            statuses = results
+        responses = self._req_many([('GET', '/health', {})] * 120, concurrency=MAX_WORKERS, cache=False)
+        statuses = [r.status_code if r else 0 for r in responses]
 
         elapsed = (time.time() - start) * 1000
         rate_limited = sum(1 for s in statuses if s == 429)
@@ -841,7 +1965,6 @@ class SecurityScanner:
             passed=rate_limited > 0,
             details=f"Blocked: {rate_limited}/120 in {elapsed:.0f}ms",
             duration_ms=elapsed,
-            requests_sent=120,
             status_codes=statuses
         )
         print(f"  [{'✓' if rate_limited > 0 else '!'}] Global rate limit: {rate_limited}/120 blocked ({elapsed:.0f}ms)")
@@ -874,7 +1997,6 @@ class SecurityScanner:
             category="RATE",
             passed=auth_blocked > 0,
             details=f"Blocked: {auth_blocked}/15",
-            requests_sent=15,
             status_codes=auth_statuses
         )
         print(f"  [{'✓' if auth_blocked > 0 else '!'}] Auth rate limit: {auth_blocked}/15 blocked")
@@ -882,17 +2004,12 @@ class SecurityScanner:
         # Test 3: Slowloris-style (many concurrent connections)
         print(f"  [>] Concurrent connections test...")
         start = time.time()
-        concurrent_statuses = []
-
-        def slow_request(_):
-            try:
-                r = requests.get(f"{self.base_url}/health", timeout=10, headers={'Connection': 'keep-alive'})
-                return r.status_code
-            except:
-                return 0
-
-        with ThreadPoolExecutor(max_workers=50) as executor:
-            concurrent_statuses = list(executor.map(slow_request, range(50)))
+        responses = self._req_many(
+            [('GET', '/health', {'timeout': 10, 'headers': {'Connection': 'keep-alive'}})] * CONCURRENT_PROBE_CONNECTIONS,
+            concurrency=CONCURRENT_PROBE_CONNECTIONS,
+            cache=False,
+        )
+        concurrent_statuses = [r.status_code if r else 0 for r in responses]
 
         concurrent_elapsed = (time.time() - start) * 1000
         concurrent_success = sum(1 for s in concurrent_statuses if s == 200)
@@ -902,7 +2019,6 @@ class SecurityScanner:
             passed=concurrent_success > 0,
             details=f"Success: {concurrent_success}/50 in {concurrent_elapsed:.0f}ms",
             duration_ms=concurrent_elapsed,
-            requests_sent=50,
         )
         print(f"  [{'✓' if concurrent_success > 0 else '✗'}] Concurrent: {concurrent_success}/50 succeeded ({concurrent_elapsed:.0f}ms)")
 
@@ -924,11 +2040,11 @@ class SecurityScanner:
         ]
 
         misconfigured = []
-        for origin in malicious_origins:
-            r = self._req('OPTIONS', '/health', headers={
-                'Origin': origin,
-                'Access-Control-Request-Method': 'GET'
-            })
+        responses = self._req_many([('OPTIONS', '/health', {'headers': {
+            'Origin': origin,
+            'Access-Control-Request-Method': 'GET'
+        }}) for origin in malicious_origins])
+        for origin, r in zip(malicious_origins, responses):
             if r:
                 allow_origin = r.headers.get('Access-Control-Allow-Origin', '')
                 if allow_origin == origin or allow_origin == '*':
@@ -939,7 +2055,6 @@ class SecurityScanner:
             category="CORS",
             passed=len(misconfigured) == 0,
             details=f"Misconfigured: {misconfigured}" if misconfigured else "All malicious origins rejected",
-            requests_sent=len(malicious_origins),
         )
         print(f"  [{'✗' if misconfigured else '✓'}] CORS: {len(malicious_origins) - len(misconfigured)}/{len(malicious_origins)} origins properly blocked")
 
@@ -967,7 +2082,6 @@ class SecurityScanner:
                 category="CORS",
                 passed=not bad_combo,
                 details=f"Credentials: {allow_creds}, Origin: {allow_origin}",
-                requests_sent=1,
             )
             print(f"  [{'✗' if bad_combo else '✓'}] Credentials+wildcard: {'VULNERABLE' if bad_combo else 'Safe'}")
 
@@ -1020,7 +2134,6 @@ class SecurityScanner:
             category="HEADERS",
             passed=passed,
             details=f"Present: {len(present)}, Missing: {missing}",
-            requests_sent=1,
         )
 
         for h in present:
@@ -1058,7 +2171,6 @@ class SecurityScanner:
             category="WEBHOOK",
             passed=webhook_safe,
             details=f"Status: {r.status_code if r else 'no response'}",
-            requests_sent=1,
         )
         print(f"  [{'✓' if webhook_safe else '!'}] Forged webhook: Status {r.status_code if r else 'N/A'}")
 
@@ -1072,7 +2184,6 @@ class SecurityScanner:
             category="WEBHOOK",
             passed=True,  # Hard to verify externally
             details="Replay sent - verify no double-processing in logs",
-            requests_sent=2,
         )
         print(f"  [i] Webhook replay: Sent duplicate - check server logs for double-processing")
 
@@ -1090,7 +2201,6 @@ class SecurityScanner:
             category="WEBHOOK",
             passed=sig_check,
             details=f"Invalid signature handled gracefully",
-            requests_sent=1,
         )
         print(f"  [{'✓' if sig_check else '✗'}] Invalid signature: Handled gracefully")
 
@@ -1123,7 +2233,6 @@ class SecurityScanner:
             category="WEBHOOK",
             passed=crash_count == 0,
             details=f"Crashes: {crash_count}/{len(malformed)}",
-            requests_sent=len(malformed),
         )
         print(f"  [{'✗' if crash_count > 0 else '✓'}] Malformed payloads: {crash_count} crashes")
 
@@ -1160,7 +2269,6 @@ class SecurityScanner:
                 category="MASS_ASSIGN",
                 passed=role_safe,
                 details=f"Role: {user.get('role')}, KYC: {user.get('kycStatus')}",
-                requests_sent=1,
             )
             print(f"  [{'✓' if role_safe else '✗'}] Register role: {user.get('role')} (expected: fan)")
             print(f"  [{'✓' if kyc_safe else '✗'}] Register KYC: {user.get('kycStatus')} (expected: none)")
@@ -1184,7 +2292,6 @@ class SecurityScanner:
                 category="MASS_ASSIGN",
                 passed=True,
                 details=f"Registration with extra fields returned {r.status_code if r else 'no response'}",
-                requests_sent=1,
             )
             print(f"  [✓] Register with extra fields: Handled (status: {r.status_code if r else 'N/A'})")
 
@@ -1199,36 +2306,29 @@ class SecurityScanner:
         # Test 1: Health endpoint information
         r = self._req('GET', '/health')
         if r:
-            data = r.json()
-            sensitive_keys = ['database', 'redis', 'env', 'config', 'secret', 'key', 'password', 'token']
-            exposed = [k for k in sensitive_keys if k in json.dumps(data).lower()]
+            hits = [m for m in r.signature_matches().values() if m.signature.kind == 'leak']
+            exposed = [m.signature.label for m in hits]
             safe = len(exposed) == 0
             self.add_result(
                 test_name="Health endpoint data exposure",
                 category="PRIVACY",
                 passed=safe,
-                details=f"Exposed: {exposed}" if exposed else "No sensitive data in health",
-                requests_sent=1,
+                details=f"Exposed: {exposed} ({', '.join(map(str, hits))})" if exposed else "No sensitive data in health",
             )
             print(f"  [{'✗' if exposed else '✓'}] Health endpoint: {'Exposes: ' + str(exposed) if exposed else 'Clean'}")
 
         # Test 2: Error messages information leakage
         r = self._req('GET', '/nonexistent-route-12345')
         if r:
-            text = r.text
-            leaks = []
-            if 'stack' in text.lower(): leaks.append('stack trace')
-            if 'node_modules' in text: leaks.append('node_modules path')
-            if 'at ' in text and '.ts:' in text: leaks.append('source file path')
-            if 'SELECT' in text or 'FROM' in text: leaks.append('SQL query')
+            hits = [m for m in r.signature_matches().values() if m.signature.kind == 'error']
+            leaks = list(dict.fromkeys(m.signature.label for m in hits))
 
             safe = len(leaks) == 0
             self.add_result(
                 test_name="Error response information leakage",
                 category="PRIVACY",
                 passed=safe,
-                details=f"Leaks: {leaks}" if leaks else "No information leakage",
-                requests_sent=1,
+                details=f"Leaks: {leaks} ({', '.join(map(str, hits))})" if leaks else "No information leakage",
             )
             print(f"  [{'✗' if leaks else '✓'}] Error leakage: {leaks if leaks else 'None'}")
 
@@ -1244,7 +2344,6 @@ class SecurityScanner:
                 category="PRIVACY",
                 passed=safe,
                 details=f"Exposed fields: {exposed}" if exposed else "No sensitive fields in public profile",
-                requests_sent=1,
             )
             print(f"  [{'✗' if exposed else '✓'}] Public profile: {exposed if exposed else 'Clean'}")
 
@@ -1266,21 +2365,19 @@ class SecurityScanner:
                 category="PRIVACY",
                 passed=True,
                 details="Profile not found or requires auth",
-                requests_sent=1,
             )
             print(f"  [✓] Public profile: Not accessible or clean")
 
         # Test 4: Verbose error messages
         r = self._req('POST', '/auth/login', json={'email': 'x', 'password': 'x'})
         if r and r.json():
-            error_msg = json.dumps(r.json())
-            has_internal = any(k in error_msg for k in ['internal', 'postgresql', 'drizzle', 'neon'])
+            hits = [m for m in r.signature_matches().values() if m.signature.kind == 'internal']
+            has_internal = bool(hits)
             self.add_result(
                 test_name="Verbose error message check",
                 category="PRIVACY",
                 passed=not has_internal,
-                details=f"Internal info leaked" if has_internal else "Error messages are safe",
-                requests_sent=1,
+                details=f"Internal info leaked ({', '.join(map(str, hits))})" if has_internal else "Error messages are safe",
             )
             print(f"  [{'✗' if has_internal else '✓'}] Error messages: {'Leaks internals' if has_internal else 'Safe'}")
 
@@ -1291,7 +2388,7 @@ class SecurityScanner:
     def calculate_scores(self) -> ScanReport:
         report = ScanReport(target=self.target)
         report.scan_start = datetime.now(timezone.utc).isoformat()
-        report.findings = [asdict(f) for f in self.findings]
+        report.findings = [{**asdict(f), 'fingerprint': f.fingerprint} for f in self.findings]
         report.test_results = [asdict(r) for r in self.results]
         report.total_tests = len(self.results)
         report.tests_passed = sum(1 for r in self.results if r.passed)
@@ -1346,6 +2443,15 @@ class SecurityScanner:
             f"Confidence Score: {report.confidence_score}/100 (Grade: {report.grade})"
         )
 
+        report.transport = self.transport.summary()
+        report.cache = self.cache.stats() if self.cache is not None else {'enabled': False}
+        report.transport = self.restored_metrics.get('transport', report.transport)
+        report.cache = self.restored_metrics.get('cache', report.cache)
+        report.suite_timings = [run.timing() for run in self.suite_runs]
+        report.critical_path = critical_path(self.suite_runs)
+        report.corpora = self.restored_metrics.get(
+            'corpora', {name: corpus.describe() for name, corpus in self.corpora.items()})
+
         report.scan_end = datetime.now(timezone.utc).isoformat()
         return report
 
@@ -1366,6 +2472,15 @@ class SecurityScanner:
         md.append(f"| Aprovados | {report.tests_passed} |")
         md.append(f"| Reprovados | {report.tests_failed} |")
         md.append(f"| Vulnerabilidades Encontradas | {len(report.findings)} |")
+        if report.cache.get('enabled'):
+            md.append(f"| Cache de Respostas | {report.cache['hits']} hits / {report.cache['misses']} misses "
+                      f"({report.cache['requests_saved']} requisições economizadas) |")
+        custom = [c for c in report.corpora.values()
+                  if c['path'] or c['sample'] < 1.0 or c['shard'] != '1/1']
+        if custom:
+            md.append("| Corpora de Payloads | " + ', '.join(
+                f"`{c['version']}` (shard {c['shard']}, amostra {c['sample']:.0%}, "
+                f"{c['stats'].get('sent', 0)} enviados)" for c in custom) + " |")
 
         # Category breakdown
         md.append(f"\n## Scores por Categoria")
@@ -1391,6 +2506,8 @@ class SecurityScanner:
                 if f.get('owasp_id'): md.append(f"- **OWASP:** {f['owasp_id']}")
                 md.append(f"- **CVSS Estimado:** {f['cvss_estimate']}")
                 md.append(f"- **Evidência:** `{f['evidence'][:200]}`")
+                if f.get('corpus'): md.append(f"- **Corpus:** `{f['corpus']}`")
+                if f.get('signature'): md.append(f"- **Assinatura:** `{f['signature']}` no byte {f['signature_offset']}")
                 md.append(f"- **Remediação:** {f['remediation']}")
 
         # Test details
@@ -1401,17 +2518,199 @@ class SecurityScanner:
             icon = '✅' if t['passed'] else '❌'
             md.append(f"| {i} | {t['test_name']} | {t['category']} | {icon} | {t['requests_sent']} | {t['details'][:80]} |")
 
+        # Baseline diff
+        if report.baseline.get('previous_scan'):
+            b = report.baseline
+            md.append(f"\n## Diferença vs. Baseline")
+            md.append(f"\nComparado ao scan #{b['previous_scan']} ({b['previous_scan_start']}): "
+                      f"**{len(b['new'])} novos**, **{len(b['fixed'])} corrigidos**, {len(b['unchanged'])} inalterados.")
+            if b['reused_suites']:
+                md.append(f"\nSuites reaproveitadas do baseline (sem mudanças e aprovadas): {', '.join(b['reused_suites'])}")
+            for label, key in (('Novos', 'new'), ('Corrigidos', 'fixed')):
+                if b[key]:
+                    md.append(f"\n### {label}")
+                    for f in b[key]:
+                        md.append(f"- [{f['severity']}] {f['title']} — `{f['endpoint']}` (`{f['fingerprint']}`)")
+            md.append(f"\n| Categoria | Antes | Depois | Δ |")
+            md.append(f"|---|---|---|---|")
+            for cat, d in b['category_scores'].items():
+                md.append(f"| {cat} | {d['before']} | {d['after']} | {d['delta']:+} |")
+
+        # Transport metrics
+        if report.transport.get('totals', {}).get('requests'):
+            totals = report.transport['totals']
+            md.append(f"\n## Métricas de Transporte")
+            md.append(f"\n{totals['requests']} requisições, p50 {totals['p50_ms']} ms, p95 {totals['p95_ms']} ms, "
+                      f"p99 {totals['p99_ms']} ms · {totals['bytes_out']} B enviados / {totals['bytes_in']} B recebidos · "
+                      f"{totals['retries']} retries, {totals['timeouts']} timeouts · "
+                      f"conexões: {totals['new_connections']} novas / {totals['reused_connections']} reaproveitadas")
+            for title, key in (('Suite', 'suites'), ('Endpoint', 'endpoints')):
+                md.append(f"\n| {title} | Req | p50 (ms) | p95 (ms) | p99 (ms) | Bytes in/out | Retries | Timeouts | Conexões novas/reuso | Cache |")
+                md.append(f"|---|---|---|---|---|---|---|---|---|---|")
+                for name, m in report.transport[key].items():
+                    md.append(f"| `{name}` | {m['requests']} | {m['p50_ms']} | {m['p95_ms']} | {m['p99_ms']} | "
+                              f"{m['bytes_in']}/{m['bytes_out']} | {m['retries']} | {m['timeouts']} | "
+                              f"{m['new_connections']}/{m['reused_connections']} | {m['cache_hits']} |")
+
+        # Suite timeline
+        if report.suite_timings:
+            md.append(f"\n## Cronograma das Suites")
+            md.append(f"\n| Suite | Grupo | Início (ms) | Fim (ms) | Duração (ms) | Caminho crítico |")
+            md.append(f"|---|---|---|---|---|---|")
+            for t in report.suite_timings:
+                on_path = '●' if t['suite'] in report.critical_path else ''
+                error = f" ⚠️ {t['error']}" if t['error'] else ''
+                md.append(f"| {t['suite']}{error} | {t['group']} | {t['start_ms']} | {t['end_ms']} | {t['duration_ms']} | {on_path} |")
+
         md.append(f"\n---")
         md.append(f"\n**IMPORTANTE:** Este relatório deve ser consolidado com o relatório de auditoria interna.")
         md.append(f"Copie o conteúdo do arquivo `external_scan_report.json` e cole no prompt do Claude para consolidação.")
 
         return '\n'.join(md)
 
+    # ========================================================================
+    # SCHEDULER DE SUITES
+    # ========================================================================
+
+    def _run_suite(self, spec: tuple, t0: float, output: Optional[_SuiteOutput] = None) -> SuiteRun:
+        name, method, group = spec
+        run = SuiteRun(name=name, method=method, group=group or "", run_id=uuid.uuid4().hex[:12])
+        self._suite.run = run
+        self._suite.checkpoint = time.perf_counter()
+        self._suite.sent = 0
+        if output:
+            output.capture()
+        run.start = datetime.now(timezone.utc).isoformat()
+        run.start_ms = (time.perf_counter() - t0) * 1000
+        self._emit('suite_start', suite=name, run_id=run.run_id, method=method, group=run.group)
+        try:
+            getattr(self, method)()
+        except Exception as e:
+            run.error = f"{type(e).__name__}: {e}"
+            print(f"  [✗] Suite {name} interrompida: {run.error}")
+        finally:
+            run.end_ms = (time.perf_counter() - t0) * 1000
+            run.end = datetime.now(timezone.utc).isoformat()
+            self._suite.run = None
+            if output:
+                run.output = output.release()
+            self._emit('suite_end', run_id=run.run_id, **run.timing())
+        return run
+
+    def _emit_restored(self, run: SuiteRun):
+        """Grava no stream uma suite restaurada do baseline, para o stream bastar sozinho."""
+        run.run_id = uuid.uuid4().hex[:12]
+        self._emit('suite_start', suite=run.name, run_id=run.run_id, method=run.method, group=run.group)
+        for finding in run.findings:
+            self._emit_record('finding', finding, run)
+        for result in run.results:
+            self._emit_record('result', result, run)
+        self._emit('suite_end', run_id=run.run_id, **run.timing())
+
+    def _run_parallel(self, suites: list, jobs: int, t0: float) -> dict:
+        runs = {}
+        output = _SuiteOutput(sys.stdout)
+        sys.stdout = output
+        try:
+            # A saída de cada suite é impressa inteira, na ordem canônica,
+            # assim que as anteriores terminam
+            pending = [spec[0] for spec in suites]
+            with ThreadPoolExecutor(max_workers=jobs) as executor:
+                futures = [executor.submit(self._run_suite, spec, t0, output) for spec in suites]
+                for future in as_completed(futures):
+                    run = future.result()
+                    runs[run.name] = run
+                    while pending and pending[0] in runs:
+                        print(runs[pending.pop(0)].output, end='')
+        finally:
+            sys.stdout = output._stream
+        return runs
+
+    def _run_scheduled(self, suites: list, jobs: int, t0: float) -> dict:
+        independent = [spec for spec in suites if spec[2] is None]
+        groups: dict[str, list] = {}
+        for spec in suites:
+            if spec[2]:
+                groups.setdefault(spec[2], []).append(spec)
+
+        # Fase 1: suites independentes, em paralelo com jobs > 1
+        if jobs <= 1:
+            runs = {spec[0]: self._run_suite(spec, t0) for spec in independent}
+        else:
+            runs = self._run_parallel(independent, jobs, t0)
+
+        # Fase 2: cada grupo de isolamento sozinho, suites em série
+        for group_suites in groups.values():
+            for spec in group_suites:
+                runs[spec[0]] = self._run_suite(spec, t0)
+        return runs
+
+    def run_suites(self, suites: list, jobs: int = 1) -> list[SuiteRun]:
+        """Executa as suites e consolida findings/resultados na ordem canônica.
+
+        O agendamento é o mesmo para qualquer `jobs`: primeiro as suites
+        independentes (num pool de threads quando jobs > 1), depois cada grupo
+        de isolamento sozinho, com suas suites em série. Assim --jobs muda só o
+        tempo do scan, nunca os rate limits que cada suite encontra.
+        """
+        reused = {spec[0]: self.reused_runs[spec[0]] for spec in suites if spec[0] in self.reused_runs}
+        for name, run in reused.items():
+            # Suites vindas do stream (--resume) já têm run_id e eventos gravados
+            print(f"\n[=] {name}: {'retomada do stream' if run.run_id else 'inalterada desde o baseline'}"
+                  f" — resultados reaproveitados")
+            if not run.run_id:
+                self._emit_restored(run)
+        pending = [spec for spec in suites if spec[0] not in reused]
+
+        t0 = time.perf_counter()
+        runs = self._run_scheduled(pending, jobs, t0)
+        runs.update(reused)
+
+        self.suite_runs = [runs[spec[0]] for spec in suites]
+        for run in self.suite_runs:
+            self.findings.extend(run.findings)
+            self.results.extend(run.results)
+        return self.suite_runs
+
+    @classmethod
+    def from_stream(cls, path: str) -> 'SecurityScanner':
+        """Reconstrói o estado de um scan a partir do stream NDJSON, sem enviar requisições.
+
+        calculate_scores e generate_markdown_report funcionam normalmente sobre o
+        scanner retornado, mesmo que o scan tenha sido interrompido no meio.
+        """
+        start, runs, end = load_stream(path)
+        scanner = cls(start['target'])
+        scanner.suite_runs = [runs[name] for name, _, _ in SUITES if name in runs]
+        for run in scanner.suite_runs:
+            scanner.findings.extend(run.findings)
+            scanner.results.extend(run.results)
+        if end:
+            scanner.restored_metrics = {'transport': end.get('transport', {}), 'cache': end.get('cache', {})}
+        if 'corpora' in start:
+            scanner.restored_metrics['corpora'] = start['corpora']
+        return scanner
+
+    def suite_signature(self, method: str) -> str:
+        """Hash da definição da suite: o código do método, os corpora que ela consome e as regras de assinatura.
+
+        Retorna '' quando o código-fonte não está disponível, o que força a
+        suite a rodar de novo em --since-baseline.
+        """
+        try:
+            source = inspect.getsource(getattr(type(self), method))
+        except (OSError, TypeError):
+            return ''
+        corpora = ''.join(f"\n{self.corpora[name].signature}" for name in SUITE_CORPORA.get(method, ()))
+        rules = SUITE_SIGNATURES.get(method)
+        rules = f"\nsignatures={rules.signature}" if rules else ''
+        return hashlib.sha256(f"{VERSION}\n{source}{corpora}{rules}".encode('utf-8')).hexdigest()[:16]
+
     # ========================================================================
     # RUN ALL TESTS
     # ========================================================================
 
-    def run_all(self) -> ScanReport:
+    def run_all(self, suites: Optional[list] = None, jobs: int = 1) -> ScanReport:
         print("=" * 70)
         print("  FANDREAMS PLATFORM — EXTERNAL SECURITY SCANNER v" + VERSION)
         print(f"  Target: {self.target}")
@@ -1427,23 +2726,17 @@ class SecurityScanner:
             print(f"      Verifique se a URL está correta e a API está rodando.")
             sys.exit(1)
         print(f"  [✓] Target acessível: {r.status_code}")
+        self._emit('scan_start', target=self.target, scanner_version=VERSION, engine=self.engine.name,
+                   suites=[spec[0] for spec in (SUITES if suites is None else suites)],
+                   corpora={name: corpus.describe() for name, corpus in self.corpora.items()})
 
-        # Run all test suites
-        self.test_reconnaissance()
-        self.test_auth_bruteforce()
-        self.test_jwt_attacks()
-        self.test_injection_attacks()
-        self.test_xss_attacks()
-        self.test_authorization_attacks()
-        self.test_rate_limiting()
-        self.test_cors()
-        self.test_security_headers()
-        self.test_webhook_security()
-        self.test_mass_assignment()
-        self.test_data_exposure()
+        # Run selected test suites
+        self.run_suites(SUITES if suites is None else suites, jobs=jobs)
 
         # Calculate scores and generate report
         report = self.calculate_scores()
+        self._emit('scan_end', confidence_score=report.confidence_score, grade=report.grade,
+                   transport=report.transport, cache=report.cache)
 
         print("\n" + "=" * 70)
         print(f"  RESULTADO FINAL")
@@ -1465,10 +2758,385 @@ class SecurityScanner:
         for cat, data in report.category_scores.items():
             bar = '█' * int(data['score'] / 5) + '░' * (20 - int(data['score'] / 5))
             print(f"    {cat:20s} [{bar}] {data['score']}%")
+        if report.critical_path:
+            print(f"\n  Caminho crítico: {' → '.join(report.critical_path)}")
 
         return report
 
 
+# ============================================================================
+# BASELINE (SQLITE)
+# ============================================================================
+
+class BaselineStore:
+    """Histórico local de scans em SQLite, usado por --since-baseline e pelo diff de findings."""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS scans (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            target TEXT NOT NULL,
+            scan_start TEXT,
+            scan_end TEXT,
+            confidence_score REAL,
+            grade TEXT,
+            report_json TEXT
+        );
+        CREATE TABLE IF NOT EXISTS findings (
+            scan_id INTEGER NOT NULL REFERENCES scans(id),
+            suite TEXT,
+            fingerprint TEXT NOT NULL,
+            severity TEXT,
+            category TEXT,
+            endpoint TEXT,
+            title TEXT
+        );
+        CREATE INDEX IF NOT EXISTS findings_scan ON findings(scan_id);
+        CREATE TABLE IF NOT EXISTS suite_state (
+            target TEXT NOT NULL,
+            suite TEXT NOT NULL,
+            signature TEXT,
+            failed INTEGER,
+            scan_id INTEGER,
+            findings_json TEXT,
+            results_json TEXT,
+            PRIMARY KEY (target, suite)
+        );
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.row_factory = sqlite3.Row
+        self.db.executescript(self.SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def _latest_scan(self, target: str) -> Optional[sqlite3.Row]:
+        return self.db.execute(
+            "SELECT * FROM scans WHERE target = ? ORDER BY id DESC LIMIT 1", (target,)
+        ).fetchone()
+
+    def reusable_runs(self, scanner: 'SecurityScanner', suites: list) -> dict:
+        """Suites cuja definição não mudou e que passaram da última vez, restauradas do baseline."""
+        reusable = {}
+        for name, method, group in suites:
+            row = self.db.execute(
+                "SELECT * FROM suite_state WHERE target = ? AND suite = ?", (scanner.target, name)
+            ).fetchone()
+            signature = scanner.suite_signature(method)
+            if row is None or row['failed'] or not signature or row['signature'] != signature:
+                continue
+            reusable[name] = SuiteRun(
+                name=name, method=method, group=group or "", reused=True,
+                findings=[Finding(**f) for f in json.loads(row['findings_json'])],
+                results=[TestResult(**r) for r in json.loads(row['results_json'])],
+            )
+        return reusable
+
+    def diff(self, target: str, report: ScanReport, runs: list) -> dict:
+        """Findings novos/corrigidos/inalterados e variação dos scores contra o último scan do target."""
+        previous = self._latest_scan(target)
+        diff = {
+            'previous_scan': previous['id'] if previous else None,
+            'previous_scan_start': previous['scan_start'] if previous else None,
+            'reused_suites': [run.name for run in runs if run.reused],
+            'new': [], 'fixed': [], 'unchanged': [],
+            'category_scores': {},
+        }
+        if previous is None:
+            return diff
+
+        def compact(f) -> dict:
+            return {k: f[k] for k in ('fingerprint', 'severity', 'category', 'endpoint', 'title')}
+
+        # Só compara suites presentes neste scan: suites puladas não viram "corrigidas"
+        in_scan = {run.name for run in runs}
+        before = {
+            row['fingerprint']: compact(row)
+            for row in self.db.execute("SELECT * FROM findings WHERE scan_id = ?", (previous['id'],))
+            if row['suite'] in in_scan
+        }
+        after = {f['fingerprint']: compact(f) for f in report.findings}
+        diff['new'] = [f for fp, f in after.items() if fp not in before]
+        diff['fixed'] = [f for fp, f in before.items() if fp not in after]
+        diff['unchanged'] = [f for fp, f in after.items() if fp in before]
+
+        # Idem para os scores: categorias de suites puladas não "caem" para 0
+        old_scores = json.loads(previous['report_json']).get('category_scores', {})
+        for cat, data in report.category_scores.items():
+            old = old_scores.get(cat, {}).get('score', 0.0)
+            new = data.get('score', 0.0)
+            diff['category_scores'][cat] = {'before': old, 'after': new, 'delta': round(new - old, 1)}
+        return diff
+
+    def save(self, report: ScanReport, scanner: 'SecurityScanner') -> int:
+        with self.db:
+            scan_id = self.db.execute(
+                "INSERT INTO scans (target, scan_start, scan_end, confidence_score, grade, report_json) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (report.target, report.scan_start, report.scan_end, report.confidence_score, report.grade,
+                 json.dumps(asdict(report), ensure_ascii=False, default=str)),
+            ).lastrowid
+            for run in scanner.suite_runs:
+                self.db.executemany(
+                    "INSERT INTO findings (scan_id, suite, fingerprint, severity, category, endpoint, title) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(scan_id, run.name, f.fingerprint, f.severity, f.category, f.endpoint, f.title)
+                     for f in run.findings],
+                )
+                if run.reused:
+                    continue
+                self.db.execute(
+                    "INSERT OR REPLACE INTO suite_state "
+                    "(target, suite, signature, failed, scan_id, findings_json, results_json) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (report.target, run.name, scanner.suite_signature(run.method), int(run.failed), scan_id,
+                     json.dumps([asdict(f) for f in run.findings], ensure_ascii=False, default=str),
+                     json.dumps([asdict(r) for r in run.results], ensure_ascii=False, default=str)),
+                )
+        return scan_id
+
+
+# ============================================================================
+# EXECUÇÃO (TARGET ÚNICO E FROTA)
+# ============================================================================
+
+def exit_code_for(report: ScanReport) -> int:
+    """2 com finding crítico, 1 com nota abaixo de 60, 0 caso contrário."""
+    if any(f['severity'] == 'CRITICAL' for f in report.findings):
+        return 2
+    if report.confidence_score < 60:
+        return 1
+    return 0
+
+
+def scan_target(args: argparse.Namespace, target: str, output: str,
+                load_cap: Optional[int] = None) -> ScanReport:
+    """Executa o scan completo de um target e grava os relatórios em `output`."""
+    os.makedirs(output, exist_ok=True)
+    store = None if args.no_baseline else BaselineStore(os.path.join(output, BASELINE_DB))
+
+    # Suites já concluídas num stream anterior (--resume) não rodam de novo
+    resumed, append = {}, False
+    if args.stream and args.resume and os.path.exists(args.stream):
+        selected = {spec[0] for spec in args.selected_suites}
+        try:
+            _, runs, _ = load_stream(args.stream)
+        except ValueError:
+            # Sem scan_start (ex.: o scan anterior parou na checagem de conectividade): nada a retomar
+            print(f"  [i] {args.stream} não tem scan iniciado — começando do zero")
+        else:
+            append = True
+            resumed = {name: run for name, run in runs.items() if name in selected and not run.error}
+    stream = EventStream(args.stream, append=append) if args.stream else None
+
+    cache = None if args.no_cache else ResponseCache(ttl=args.cache_ttl, max_entries=args.cache_size)
+    scanner = SecurityScanner(target, verbose=args.verbose, engine=args.engine,
+                              concurrency=args.concurrency, cache=cache, load_cap=load_cap, stream=stream,
+                              corpora=args.corpora)
+    if args.since_baseline:
+        scanner.reused_runs = store.reusable_runs(scanner, args.selected_suites)
+    scanner.reused_runs.update(resumed)
+    try:
+        report = scanner.run_all(args.selected_suites, jobs=args.jobs)
+    finally:
+        scanner.close()
+        if stream is not None:
+            stream.close()
+
+    # Diff against baseline and record this scan
+    if store is not None:
+        report.baseline = store.diff(scanner.target, report, scanner.suite_runs)
+        scan_id = store.save(report, scanner)
+        store.close()
+        if report.baseline['previous_scan']:
+            print(f"\n  Baseline #{report.baseline['previous_scan']}: {len(report.baseline['new'])} novos, "
+                  f"{len(report.baseline['fixed'])} corrigidos, {len(report.baseline['unchanged'])} inalterados")
+        print(f"  🗄️  Scan #{scan_id} salvo em {store.path}")
+
+    write_reports(scanner, report, output)
+
+    # Save Prometheus metrics
+    if args.prometheus:
+        with open(args.prometheus, 'w', encoding='utf-8') as f:
+            f.write(scanner.transport.prometheus(scanner.target))
+        print(f"  📄 Prometheus metrics saved: {args.prometheus}")
+
+    return report
+
+
+def write_reports(scanner: SecurityScanner, report: ScanReport, output: str):
+    """Grava external_scan_report.json e .md em `output`."""
+    # Save JSON report
+    json_path = os.path.join(output, 'external_scan_report.json')
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(asdict(report), f, indent=2, ensure_ascii=False, default=str)
+    print(f"\n  📄 JSON report saved: {json_path}")
+
+    # Save Markdown report
+    md_path = os.path.join(output, 'external_scan_report.md')
+    md_content = scanner.generate_markdown_report(report)
+    with open(md_path, 'w', encoding='utf-8') as f:
+        f.write(md_content)
+    print(f"  📄 Markdown report saved: {md_path}")
+
+
+def report_from_stream(path: str, output: str) -> ScanReport:
+    """Gera os relatórios JSON/Markdown só a partir de um stream NDJSON (scan completo ou parcial)."""
+    scanner = SecurityScanner.from_stream(path)
+    try:
+        report = scanner.calculate_scores()
+    finally:
+        scanner.close()
+    print(f"  Stream {path}: {len(scanner.suite_runs)} suites concluídas, {report.total_tests} testes, "
+          f"{len(report.findings)} findings — Nota {report.confidence_score}/100 (Grade: {report.grade})")
+    os.makedirs(output, exist_ok=True)
+    write_reports(scanner, report, output)
+    return report
+
+
+def _target_slug(target: str) -> str:
+    """Diretório do target na frota: legível, com esquema e um hash curto da URL para nunca colidir."""
+    parts = urlsplit(target)
+    readable = re.sub(r'[^A-Za-z0-9.-]+', '_', f"{parts.scheme}_{parts.netloc}{parts.path}").strip('_') or 'target'
+    return f"{readable}-{hashlib.sha256(target.encode('utf-8')).hexdigest()[:8]}"
+
+
+def _fleet_worker(args: argparse.Namespace, target: str, output: str, per_target: int) -> dict:
+    """Scan de um target dentro do pool de processos; a saída de console vai para scan.log."""
+    os.makedirs(output, exist_ok=True)
+    # Arquivos auxiliares (métricas, stream) vão para o diretório de cada target
+    per_target_files = {k: os.path.join(output, os.path.basename(getattr(args, k)))
+                        for k in ('prometheus', 'stream') if getattr(args, k)}
+    args = argparse.Namespace(**{**vars(args), **per_target_files})
+    entry = {'target': target, 'output': output, 'confidence_score': 0.0, 'grade': 'F',
+             'exit_code': 1, 'error': '', 'findings': []}
+    with open(os.path.join(output, 'scan.log'), 'w', encoding='utf-8') as log, contextlib.redirect_stdout(log):
+        try:
+            report = scan_target(args, target, output, load_cap=per_target)
+        except SystemExit as e:     # run_all encerra quando o target está inacessível
+            entry['error'] = f"scan encerrado (exit {e.code})"
+            return entry
+        except Exception as e:
+            entry['error'] = f"{type(e).__name__}: {e}"
+            return entry
+    entry.update(
+        confidence_score=report.confidence_score,
+        grade=report.grade,
+        exit_code=exit_code_for(report),
+        tests=f"{report.tests_passed}/{report.total_tests}",
+        findings=[{k: f[k] for k in ('fingerprint', 'severity', 'category', 'endpoint', 'title')}
+                  for f in report.findings],
+    )
+    return entry
+
+
+def read_targets(path: str) -> list:
+    """Um target por linha; linhas vazias e comentários (#) são ignorados."""
+    with open(path, encoding='utf-8') as f:
+        lines = (line.split('#', 1)[0].strip() for line in f)
+        return list(dict.fromkeys(line.rstrip('/') for line in lines if line))
+
+
+def run_fleet(args: argparse.Namespace, targets: list) -> int:
+    """Escaneia vários targets num pool de processos e gera o resumo da frota.
+
+    Cada target recebe no máximo `--per-target` requisições simultâneas e o
+    número de processos é escolhido para que a soma caiba em `--fleet-budget`.
+    Retorna o pior exit code entre os targets.
+    """
+    per_target = max(1, min(args.per_target, args.fleet_budget))
+    workers = max(1, min(len(targets), args.fleet_budget // per_target))
+    args.concurrency = min(args.concurrency, per_target)
+    args.jobs = max(1, min(args.jobs, per_target))
+
+    print("=" * 70)
+    print(f"  FANDREAMS — FLEET SCAN: {len(targets)} targets, {workers} processos, "
+          f"{per_target} req. simultâneas por target (budget {args.fleet_budget})")
+    print("=" * 70)
+
+    entries = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(_fleet_worker, args, target,
+                            os.path.join(args.output, _target_slug(target)), per_target): target
+            for target in targets
+        }
+        for i, future in enumerate(as_completed(futures), 1):
+            entry = future.result()
+            entries.append(entry)
+            status = f"ERRO: {entry['error']}" if entry['error'] else \
+                f"{entry['confidence_score']}/100 (Grade: {entry['grade']}), {len(entry['findings'])} findings"
+            print(f"  [{i}/{len(targets)}] {entry['target']} — {status}")
+
+    summary = fleet_summary(entries)
+    os.makedirs(args.output, exist_ok=True)
+    json_path = os.path.join(args.output, 'fleet_summary.json')
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2, ensure_ascii=False, default=str)
+    md_path = os.path.join(args.output, 'fleet_summary.md')
+    with open(md_path, 'w', encoding='utf-8') as f:
+        f.write(fleet_markdown(summary))
+    print(f"\n  📄 Fleet summary saved: {json_path}")
+    print(f"  📄 Markdown summary saved: {md_path}")
+    return summary['exit_code']
+
+
+def fleet_summary(entries: list) -> dict:
+    """Ranking por nota (pior primeiro) e findings presentes em mais de um target."""
+    ranking = sorted(entries, key=lambda e: (e['confidence_score'], -e['exit_code'], e['target']))
+    shared: dict[str, dict] = {}
+    for entry in entries:
+        for f in entry['findings']:
+            item = shared.setdefault(f['fingerprint'], {**f, 'targets': []})
+            if entry['target'] not in item['targets']:
+                item['targets'].append(entry['target'])
+    severity_rank = {'CRITICAL': 0, 'HIGH': 1, 'MEDIUM': 2, 'LOW': 3, 'INFO': 4}
+    shared_list = sorted(
+        (item for item in shared.values() if len(item['targets']) > 1),
+        key=lambda item: (-len(item['targets']), severity_rank.get(item['severity'], 5), item['title']),
+    )
+    return {
+        'generated_at': datetime.now(timezone.utc).isoformat(),
+        'scanner_version': VERSION,
+        'targets': len(entries),
+        'exit_code': max((e['exit_code'] for e in entries), default=0),
+        'ranking': [{k: v for k, v in e.items() if k != 'findings'} | {'findings': len(e['findings'])}
+                    for e in ranking],
+        'shared_findings': shared_list,
+    }
+
+
+def fleet_markdown(summary: dict) -> str:
+    md = []
+    md.append("# FanDreams Platform — Fleet Security Scan Summary")
+    md.append(f"\n**Scanner:** FanDreams Security Scanner v{summary['scanner_version']}")
+    md.append(f"**Date:** {summary['generated_at']}")
+    md.append(f"**Targets:** {summary['targets']} · **Exit code:** {summary['exit_code']}")
+
+    md.append(f"\n## Ranking (menor nota primeiro)")
+    md.append(f"\n| # | Target | Nota | Grade | Testes | Findings | Exit | Relatório |")
+    md.append(f"|---|---|---|---|---|---|---|---|")
+    for i, e in enumerate(summary['ranking'], 1):
+        note = f"⚠️ {e['error']}" if e['error'] else f"{e['confidence_score']}/100"
+        md.append(f"| {i} | `{e['target']}` | {note} | {e['grade']} | {e.get('tests', '-')} | "
+                  f"{e['findings']} | {e['exit_code']} | `{e['output']}` |")
+
+    md.append(f"\n## Findings Compartilhados")
+    if not summary['shared_findings']:
+        md.append(f"\nNenhum finding aparece em mais de um target.")
+    for f in summary['shared_findings']:
+        md.append(f"\n- **[{f['severity']}] {f['title']}** — `{f['endpoint']}` "
+                  f"({len(f['targets'])}/{summary['targets']} targets, `{f['fingerprint']}`)")
+        md.append(f"  - {', '.join(f'`{t}`' for t in f['targets'])}")
+    return '\n'.join(md)
+
+
+def _csv(value: str) -> list:
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='FanDreams Platform - External Security Scanner',
@@ -1478,44 +3146,97 @@ Exemplos:
   python fandreams_security_scanner.py --target https://api.fandreams.app
   python fandreams_security_scanner.py --target http://localhost:3001 --verbose
   python fandreams_security_scanner.py --target http://localhost:3001 --output ./report
+  python fandreams_security_scanner.py --target http://localhost:3001 --engine async --concurrency 4
+  python fandreams_security_scanner.py --target http://localhost:3001 --jobs 4 --skip rate
+  python fandreams_security_scanner.py --target http://localhost:3001 --suites recon,cors,headers
+  python fandreams_security_scanner.py --target http://localhost:3001 --output ./report --since-baseline
+  python fandreams_security_scanner.py --targets-file previews.txt --output ./fleet --fleet-budget 32 --per-target 8
+  python fandreams_security_scanner.py --target http://localhost:3001 --stream scan.ndjson --resume
+  python fandreams_security_scanner.py --report-from-stream scan.ndjson --output ./report
+  python fandreams_security_scanner.py --target http://localhost:3001 --corpus sql=sqli.jsonl.gz --shard 2/4
 
 AVISO: Use apenas em ambientes autorizados para testes de segurança.
         """
     )
-    parser.add_argument('--target', '-t', required=True, help='URL base da API (ex: https://api.fandreams.app)')
+    targets = parser.add_mutually_exclusive_group(required=True)
+    targets.add_argument('--target', '-t', help='URL base da API (ex: https://api.fandreams.app)')
+    targets.add_argument('--targets-file', metavar='ARQUIVO',
+                         help='Arquivo com uma URL por linha; escaneia todos em paralelo (modo frota)')
+    targets.add_argument('--report-from-stream', metavar='ARQUIVO',
+                         help='Não escaneia: reconstrói os relatórios a partir de um stream NDJSON')
     parser.add_argument('--output', '-o', default='.', help='Diretório de saída para relatórios (default: .)')
     parser.add_argument('--verbose', '-v', action='store_true', help='Modo verbose')
+    parser.add_argument('--engine', choices=['sync', 'async'], default='sync',
+                        help='Engine de requisições: sync (requests) ou async (aiohttp) (default: sync)')
+    parser.add_argument('--concurrency', type=int, default=HOST_CONCURRENCY,
+                        help=f'Máximo de requisições simultâneas por host no engine async (default: {HOST_CONCURRENCY})')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Desativa o cache de respostas GET/HEAD/OPTIONS dentro do scan')
+    parser.add_argument('--cache-ttl', type=float, default=CACHE_TTL,
+                        help=f'Validade (s) das respostas em cache (default: {CACHE_TTL:.0f})')
+    parser.add_argument('--cache-size', type=int, default=CACHE_MAX_ENTRIES,
+                        help=f'Máximo de respostas em cache, com descarte LRU (default: {CACHE_MAX_ENTRIES})')
+    parser.add_argument('--prometheus', metavar='ARQUIVO', default=None,
+                        help='Exporta as métricas de transporte no formato texto do Prometheus')
+    parser.add_argument('--suites', type=_csv, default=None,
+                        help=f'Executa só estas suites, separadas por vírgula ({",".join(n for n, _, _ in SUITES)})')
+    parser.add_argument('--skip', type=_csv, default=None, help='Suites a pular, separadas por vírgula')
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help='Suites independentes executadas em paralelo (default: 1 = sequencial)')
+    parser.add_argument('--since-baseline', action='store_true',
+                        help=f'Reexecuta só as suites alteradas ou reprovadas desde o último scan ({BASELINE_DB})')
+    parser.add_argument('--no-baseline', action='store_true',
+                        help='Não lê nem grava o histórico de scans no diretório de saída')
+    parser.add_argument('--corpus', action='append', metavar='NOME=ARQUIVO', default=[],
+                        help=f"Troca um corpus embutido ({', '.join(BUILTIN_CORPORA)}) por um arquivo "
+                             ".txt/.jsonl (opcionalmente .gz), lido sob demanda")
+    parser.add_argument('--corpus-sample', type=float, default=1.0, metavar='FRAÇÃO',
+                        help='Envia só essa fração de cada corpus (amostra estável, ex.: 0.1)')
+    parser.add_argument('--shard', type=parse_shard, default=(1, 1), metavar='i/n',
+                        help='Envia só a fatia i de n de cada corpus (para dividir entre workers de CI)')
+    parser.add_argument('--stream', metavar='ARQUIVO', default=None,
+                        help='Grava cada finding/resultado como evento NDJSON assim que acontece')
+    parser.add_argument('--resume', action='store_true',
+                        help='Com --stream: pula as suites já concluídas no stream existente')
+    parser.add_argument('--fleet-budget', type=int, default=FLEET_BUDGET,
+                        help=f'Modo frota: requisições simultâneas somando todos os targets (default: {FLEET_BUDGET})')
+    parser.add_argument('--per-target', type=int, default=HOST_CONCURRENCY,
+                        help=f'Modo frota: requisições simultâneas por target (default: {HOST_CONCURRENCY})')
 
     args = parser.parse_args()
-
-    scanner = SecurityScanner(args.target, verbose=args.verbose)
-    report = scanner.run_all()
-
-    # Save JSON report
-    os.makedirs(args.output, exist_ok=True)
-    json_path = os.path.join(args.output, 'external_scan_report.json')
-    with open(json_path, 'w', encoding='utf-8') as f:
-        json.dump(asdict(report), f, indent=2, ensure_ascii=False, default=str)
-    print(f"\n  📄 JSON report saved: {json_path}")
-
-    # Save Markdown report
-    md_path = os.path.join(args.output, 'external_scan_report.md')
-    md_content = scanner.generate_markdown_report(report)
-    with open(md_path, 'w', encoding='utf-8') as f:
-        f.write(md_content)
-    print(f"  📄 Markdown report saved: {md_path}")
+    try:
+        args.selected_suites = select_suites(args.suites, args.skip)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.since_baseline and args.no_baseline:
+        parser.error('--since-baseline requer o histórico (remova --no-baseline)')
+    if args.resume and not args.stream:
+        parser.error('--resume requer --stream')
+    if not 0.0 < args.corpus_sample <= 1.0:
+        parser.error('--corpus-sample precisa estar em (0, 1]')
+
+    if args.report_from_stream:
+        sys.exit(exit_code_for(report_from_stream(args.report_from_stream, args.output)))
+
+    try:
+        args.corpora = load_corpora(args.corpus, sample=args.corpus_sample, shard=args.shard)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.targets_file:
+        fleet_targets = read_targets(args.targets_file)
+        if not fleet_targets:
+            parser.error(f'Nenhum target em {args.targets_file}')
+        sys.exit(run_fleet(args, fleet_targets))
+
+    report = scan_target(args, args.target, args.output)
 
     print(f"\n  ⚡ Para consolidar com o teste interno, copie o conteúdo de:")
-    print(f"     {json_path}")
+    print(f"     {os.path.join(args.output, 'external_scan_report.json')}")
     print(f"     e cole no prompt do Claude.\n")
 
     # Exit code based on severity
-    critical = sum(1 for f in scanner.findings if f.severity == 'CRITICAL')
-    if critical > 0:
-        sys.exit(2)
-    elif report.confidence_score < 60:
-        sys.exit(1)
-    sys.exit(0)
+    sys.exit(exit_code_for(report))
 
 
 if __name__ == '__main__':